@@ -0,0 +1,65 @@
+import math
+import time
+from settings import *
+
+
+class AIScheduler:
+    # picks the npcs that think this tick: engaged or nearby ones every tick, idle distant ones
+    # round-robin at a lower rate, within a time budget per tick
+    def __init__(self, game):
+        self.game = game
+        self.update_cost = 0.05  # smoothed milliseconds per npc update
+        self.budget = AI_TICK_BUDGET  # milliseconds per tick for reduced-rate npcs, None for no limit
+        self.updated_total, self.skipped_total = 0, 0
+        self.reset()
+
+    def reset(self):
+        self.tick = 0
+        self.last_update = {}
+        self.updated, self.skipped = 0, 0
+
+    def get_interval(self, npc, player):
+        if not AI_LOD or not npc.alive or npc.pain or npc.ray_cast_value or player.shot:
+            return 1
+        dist = math.hypot(npc.x - player.x, npc.y - player.y)
+        if dist <= AI_NEAR_DIST:
+            return 1
+        return AI_MID_INTERVAL if dist <= AI_FAR_DIST else AI_FAR_INTERVAL
+
+    def get_due(self, npc_list):
+        self.tick += 1
+        player = self.game.player
+        full, due, idle = [], [], 0
+        for slot, npc in enumerate(npc_list):
+            if not npc.alive and npc.frame_counter >= len(npc.death_images) - 1:
+                continue  # nothing left to do once the death animation has finished
+            interval = self.get_interval(npc, player)
+            if interval == 1:
+                full.append(npc)
+                self.last_update[npc] = self.tick
+                continue
+            idle += 1
+            # spread first updates over the interval so npcs of a tier don't all think on the same tick
+            last = self.last_update.setdefault(npc, self.tick - slot % interval)
+            if self.tick - last >= interval:
+                due.append((last, slot, npc))
+
+        # most overdue first, as many as the budget allows
+        due.sort(key=lambda t: t[:2])
+        if self.budget is not None:
+            due = due[:max(1, int(self.budget / self.update_cost))]
+        due = [npc for last, slot, npc in due]
+        for npc in due:
+            self.last_update[npc] = self.tick
+        self.updated = len(full) + len(due)
+        self.skipped = idle - len(due)
+        self.updated_total += self.updated
+        self.skipped_total += self.skipped
+        return full + due
+
+    def run(self, npcs):
+        start = time.perf_counter()
+        [npc.step() for npc in npcs]
+        if npcs:
+            cost = (time.perf_counter() - start) * 1000 / len(npcs)
+            self.update_cost += (cost - self.update_cost) * 0.1
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import pygame as pg
+from settings import *
+
+PACK_MAGIC = b'DUUMPACK'
+PACK_VERSION = 1
+HEADER = struct.Struct('<8sII')  # magic, version, index length
+
+
+def get_source_files(sources=ASSET_SOURCES):
+    files = []
+    for source in sources:
+        for root, dirs, file_names in os.walk(source):
+            root = root.replace(os.sep, '/')
+            files += [root + '/' + file_name for file_name in file_names]
+    return sorted(files)
+
+
+def get_fingerprint(sources=ASSET_SOURCES):
+    # any added, removed, resized or touched source file changes the fingerprint
+    digest = hashlib.sha1(f'{PACK_VERSION} {RES} {TEXTURE_SIZE}'.encode())
+    for path in get_source_files(sources):
+        stat = os.stat(path)
+        digest.update(f'{path} {stat.st_size} {stat.st_mtime_ns}\n'.encode())
+    return digest.hexdigest()
+
+
+def write_pack(path, images, animations):
+    # header, JSON index, then the raw RGBA pixels of every image back to back
+    entries, blobs, offset = {}, [], 0
+    for key, image in images.items():
+        data = pg.image.tobytes(image, 'RGBA')
+        entries[key] = [offset, image.get_width(), image.get_height()]
+        blobs.append(data)
+        offset += len(data)
+    index = json.dumps({'fingerprint': get_fingerprint(), 'entries': entries,
+                        'animations': animations}).encode()
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, len(index)))
+        file.write(index)
+        for data in blobs:
+            file.write(data)
+    os.replace(temp_path, path)
+
+
+class AssetPack:
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, index_size = HEADER.unpack_from(self.data)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f'{path} is not a version {PACK_VERSION} asset pack')
+        index = json.loads(self.data[HEADER.size:HEADER.size + index_size])
+        self.fingerprint = index['fingerprint']
+        self.entries = index['entries']
+        self.animations = index['animations']
+        self.base = HEADER.size + index_size
+
+    @classmethod
+    def open(cls, path=ASSET_PACK_PATH):
+        # None when there is no usable pack or the sources changed since it was baked
+        try:
+            pack = cls(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        if pack.fingerprint != get_fingerprint():
+            pack.close()
+            return None
+        return pack
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get_image(self, key):
+        offset, width, height = self.entries[key]
+        start = self.base + offset
+        pixels = memoryview(self.data)[start:start + width * height * 4]
+        source = pg.image.frombuffer(pixels, (width, height), 'RGBA')
+        image = source.convert_alpha()
+        del source
+        pixels.release()
+        return image
+
+    def close(self):
+        self.data.close()
+        self.file.close()
@@ -0,0 +1,163 @@
+import os
+import struct
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pygame as pg
+from settings import *
+from asset_pack import AssetPack, write_pack, get_source_files
+
+SPRITE_SOURCES = 'resources/sprites',
+SOUND_SOURCES = 'resources/sound',
+
+
+class ImageStub:
+    # stands in for an image when nothing is drawn: the size, read from the PNG header, without the pixels
+    def __init__(self, size):
+        self.size = size
+
+    @classmethod
+    def from_png(cls, path):
+        with open(path, 'rb') as file:
+            return cls(struct.unpack('>II', file.read(24)[16:24]))
+
+    def get_width(self):
+        return self.size[0]
+
+    def get_height(self):
+        return self.size[1]
+
+    def get_size(self):
+        return self.size
+
+
+class AssetRegistry:
+    # process-wide flyweight store: every image and animation folder is decoded once and shared
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        if getattr(self, 'pack', None) is not None:
+            self.pack.close()
+        if getattr(self, 'executor', None) is not None:
+            self.finish_preload()
+        self.images = {}
+        self.animations = {}
+        self.animation_files = {}
+        self.sounds = {}
+        self.stubs = {}  # ImageStubs handed to headless games, kept apart from the decoded images
+        self.stub_animations = {}
+        self.pending = {}  # path -> future of a preload decode nobody has asked for yet
+        self.futures = []
+        self.executor = None
+        self.progress = None
+        self.pack = None
+        self.loads = 0
+        self.pack_reads = 0
+        self.bake_time = 0
+
+    def open_pack(self, path=ASSET_PACK_PATH):
+        self.pack = AssetPack.open(path)
+        return self.pack is not None
+
+    def bake(self, path=ASSET_PACK_PATH):
+        # decode every sprite folder, then write them together with everything loaded so far
+        start = time.perf_counter()
+        for folder in sorted({file.rsplit('/', 1)[0] for file in get_source_files(SPRITE_SOURCES)}):
+            self.get_animation(folder)
+        images = {self.get_pack_key(*key): image for key, image in self.images.items()}
+        if self.pack is not None:
+            # images read from the pack are copies, so the mapping can go before the file is replaced,
+            # which fails on Windows while it is mapped
+            self.pack.close()
+            self.pack = None
+        write_pack(path, images, self.animation_files)
+        self.bake_time = time.perf_counter() - start
+
+    @staticmethod
+    def get_pack_key(path, size):
+        return f'{path}@{size[0]}x{size[1]}' if size else path
+
+    @staticmethod
+    def decode(path):
+        return pg.mixer.Sound(path) if path.endswith('.wav') else pg.image.load(path)
+
+    def preload(self, progress=None, workers=ASSET_LOAD_WORKERS):
+        # start decoding every source image and sound on worker threads and return straight away, so the
+        # world is built meanwhile; load and get_sound wait for the decodes they need, and the display-format
+        # convert_alpha still happens on the main thread. progress(done, total) is called from there too
+        if self.pack is not None or not workers:
+            return
+        paths = [path for path in get_source_files(ASSET_SOURCES) if path.endswith('.png')]
+        if pg.mixer.get_init():
+            paths += [path for path in get_source_files(SOUND_SOURCES) if path.endswith('.wav')]
+        # the registry outlives a game, what an earlier one decoded is already here
+        decoded = {path for path, size in self.images} | set(self.sounds)
+        paths = [path for path in paths if path not in decoded]
+        if not paths:
+            return
+
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.pending = {path: self.executor.submit(self.decode, path) for path in paths}
+        self.futures = list(self.pending.values())
+        self.progress = progress
+
+    def finish_preload(self):
+        # startup is over: decodes nobody asked for are cancelled or dropped rather than kept for good
+        if self.executor is not None:
+            self.executor.shutdown(cancel_futures=True)
+        self.pending = {}
+        self.futures = []
+        self.executor = None
+        self.progress = None
+
+    def decode_now(self, path):
+        # the preloaded decode of path, waiting for it if it is still running, otherwise a decode right here
+        self.loads += 1
+        future = self.pending.pop(path, None)
+        if future is None:
+            return self.decode(path)
+        asset = future.result()
+        if self.progress:
+            self.progress(sum(decode.done() for decode in self.futures), len(self.futures))
+        return asset
+
+    def load(self, path):
+        return self.decode_now(path).convert_alpha()
+
+    def get_sound(self, path):
+        if path not in self.sounds:
+            self.sounds[path] = self.decode_now(path)
+        return self.sounds[path]
+
+    def get_image(self, path, size=None, headless=False):
+        # headless callers get an ImageStub instead of decoding the image
+        key = path, tuple(size) if size else None
+        if headless:
+            if key not in self.stubs:
+                self.stubs[key] = ImageStub(key[1]) if size else ImageStub.from_png(path)
+            return self.stubs[key]
+        if key not in self.images:
+            pack_key = self.get_pack_key(*key)
+            if self.pack is not None and pack_key in self.pack:
+                self.pack_reads += 1
+                self.images[key] = self.pack.get_image(pack_key)
+            else:
+                image = self.load(path)
+                self.images[key] = pg.transform.scale(image, size) if size else image
+        return self.images[key]
+
+    def get_animation(self, path, headless=False):
+        # frames of every file in the folder, in name order, as an immutable tuple
+        animations = self.stub_animations if headless else self.animations
+        if path not in animations:
+            if self.pack is not None and path in self.pack.animations:
+                files = self.pack.animations[path]
+            else:
+                files = [path + '/' + file_name for file_name in sorted(os.listdir(path))
+                         if os.path.isfile(os.path.join(path, file_name))]
+            self.animation_files[path] = files
+            animations[path] = tuple(self.get_image(file, headless=headless) for file in files)
+        return animations[path]
+
+
+assets = AssetRegistry()
@@ -0,0 +1,224 @@
+import json
+import os
+import time
+from settings import *
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(percent / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def get_benchmark_game(controls, seed, profile=False, map_path=MAP_PATH, asset_pack=ASSET_PACK):
+    # the dummy drivers have to be chosen before pygame opens the display and mixer
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    os.environ['SDL_AUDIODRIVER'] = 'dummy'
+    from main import Game
+
+    class BenchmarkGame(Game):
+        # every frame takes BENCH_FRAME_TIME, so every run simulates the same ticks; the AI scheduler has
+        # no time budget, which would make the npcs that think depend on how fast the machine is
+        def __init__(self, *args):
+            super().__init__(*args)
+            self.delta_time = BENCH_FRAME_TIME  # the first frame too
+            self.scheduler.budget = None
+
+        def tick(self):
+            self.delta_time = BENCH_FRAME_TIME
+
+        def delay(self, ms):
+            pass
+
+    return BenchmarkGame(controls, profile, map_path, asset_pack, seed)
+
+
+def time_frames(game, num_frames):
+    frame_times = []
+    for frame in range(num_frames):
+        start = time.perf_counter()
+        game.check_events()
+        game.update()
+        game.draw()
+        frame_times.append((time.perf_counter() - start) * 1000)
+    return frame_times
+
+
+def run_benchmark(num_frames=BENCH_FRAMES, seed=BENCH_SEED, replay=None, output=None, trace=None,
+                  map_path=MAP_PATH):
+    from controls import InputReplay
+    controls = InputReplay.load(replay) if replay else InputReplay.generate(num_frames, seed)
+    game = get_benchmark_game(controls, seed, profile=trace is not None, map_path=map_path)
+    game.profiler.show_overlay = False
+    game.camera.adaptive = False  # measure at a fixed ray count
+
+    frame_times = time_frames(game, num_frames)
+    total = sum(frame_times)
+    result = {
+        'frames': num_frames,
+        'seed': seed,
+        'replay': replay,
+        'map': map_path,
+        'resolution': list(RES),
+        'num_rays': game.camera.num_rays,
+        'frame_time_ms': {
+            'mean': total / num_frames,
+            'p50': percentile(frame_times, 50),
+            'p95': percentile(frame_times, 95),
+            'p99': percentile(frame_times, 99),
+            'max': max(frame_times),
+        },
+        'fps': 1000 * num_frames / total,
+        'npc_updates_per_frame': game.scheduler.updated_total / num_frames,
+        'npc_updates_skipped_per_frame': game.scheduler.skipped_total / num_frames,
+    }
+    if trace:
+        game.profiler.export_chrome_trace(trace)
+        result['stages_ms'] = {name: ms for name, depth, ms in game.profiler.get_averages()}
+    if output:
+        with open(output, 'w') as file:
+            json.dump(result, file, indent=2)
+    print(json.dumps(result))
+    return result
+
+
+def run_scaling_benchmark(num_frames=BENCH_FRAMES, seed=BENCH_SEED, worker_counts=None, output=None):
+    # the same scripted run once per ray casting worker count; stage times come from the profiler
+    from controls import InputReplay
+    cpu_count = os.cpu_count() or 1
+    if not worker_counts:
+        worker_counts = sorted({1, cpu_count} | {2 ** i for i in range(cpu_count.bit_length())})
+
+    result = {'frames': num_frames, 'seed': seed, 'cpu_count': cpu_count, 'workers': {}}
+    for workers in worker_counts:
+        game = get_benchmark_game(InputReplay.generate(num_frames, seed), seed, profile=True)
+        game.profiler.show_overlay = False
+        game.camera.adaptive = False
+        game.raycasting.set_workers(workers)
+        frame_times = time_frames(game, num_frames)
+        stages = {name: ms for name, depth, ms in game.profiler.get_averages()}
+        result['workers'][workers] = {
+            'frame_ms': sum(frame_times) / num_frames,
+            'ray_cast_ms': stages.get('ray_cast', 0),
+            'walls_ms': stages.get('walls', 0),
+            'floor_ms': stages.get('floor', 0),
+        }
+        game.raycasting.set_workers(1)
+
+    base = result['workers'][worker_counts[0]]
+    for timings in result['workers'].values():
+        timings['speedup'] = (base['ray_cast_ms'] + base['walls_ms'] + base['floor_ms']) / max(
+            1e-9, timings['ray_cast_ms'] + timings['walls_ms'] + timings['floor_ms'])
+
+    if output:
+        with open(output, 'w') as file:
+            json.dump(result, file, indent=2)
+    print(json.dumps(result))
+    return result
+
+
+def run_startup_benchmark(output=None):
+    # cold: decode every PNG and bake the pack; warm: a fresh registry reading the baked pack
+    from controls import InputReplay
+    from assets import assets
+    if os.path.exists(ASSET_PACK_PATH):
+        os.remove(ASSET_PACK_PATH)
+
+    result = {}
+    for run in ('cold', 'warm'):
+        assets.reset()
+        start = time.perf_counter()
+        get_benchmark_game(InputReplay.generate(1, BENCH_SEED), BENCH_SEED)
+        result[f'{run}_s'] = time.perf_counter() - start
+        result[f'{run}_decoded'] = assets.loads
+        result[f'{run}_pack_reads'] = assets.pack_reads
+        if run == 'cold':
+            result['bake_s'] = assets.bake_time
+
+    if output:
+        with open(output, 'w') as file:
+            json.dump(result, file, indent=2)
+    print(json.dumps(result))
+    return result
+
+
+def run_soak(num_ticks=BENCH_FRAMES, seed=BENCH_SEED, num_npcs=SOAK_NPCS, map_path=MAP_PATH, output=None):
+    # the AI alone, with no rendering and no assets decoded; stage costs are per simulation tick
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+    import pygame as pg
+    from controls import InputReplay
+    from soak import SoakGame
+    pg.display.init()  # replayed input still drains the event queue
+
+    start = time.perf_counter()
+    game = SoakGame(InputReplay.generate(num_ticks, seed), num_npcs, map_path, seed=seed)
+    setup = time.perf_counter() - start
+    totals = {}
+    start = time.perf_counter()
+    for tick in range(num_ticks):
+        game.run_tick()
+        for name, begin, duration, depth in game.profiler.events:
+            totals[name] = totals.get(name, 0) + duration
+    total = time.perf_counter() - start
+
+    result = {
+        'ticks': num_ticks,
+        'seed': seed,
+        'map': map_path,
+        'npcs': num_npcs,
+        'setup_s': setup,
+        'ticks_per_second': num_ticks / total,
+        'realtime_factor': num_ticks * SIM_DT / 1000 / total,
+        'stages_ms': {name: ns / num_ticks / 1e6 for name, ns in totals.items()},
+        'npc_updates_per_tick': game.scheduler.updated_total / num_ticks,
+        'npcs_alive': len(game.object_handler.npc_grid),
+        'games': game.games,
+        'sounds': game.sound.played,
+    }
+    if output:
+        with open(output, 'w') as file:
+            json.dump(result, file, indent=2)
+    print(json.dumps(result))
+    return result
+
+
+def run_env_benchmark(num_steps=BENCH_FRAMES, seed=BENCH_SEED, num_envs=1, workers=None, map_path=MAP_PATH,
+                      output=None):
+    # random actions in every environment of a VectorEnv, steps per second summed over all of them
+    import numpy as np
+    from env import VectorEnv
+    rng = np.random.default_rng(seed)
+    actions = np.stack([rng.integers(-1, 2, (num_steps, num_envs)), rng.integers(-1, 2, (num_steps, num_envs)),
+                        rng.integers(-MOUSE_MAX_REL // 2, MOUSE_MAX_REL // 2 + 1, (num_steps, num_envs)),
+                        rng.random((num_steps, num_envs)) < 0.05], axis=2)
+
+    with VectorEnv(num_envs, workers, map_path=map_path) as env:
+        env.reset(seed)
+        episodes = 0
+        start = time.perf_counter()
+        for step in range(num_steps):
+            observations, rewards, dones, infos = env.step(actions[step])
+            episodes += int(dones.sum())
+        total = time.perf_counter() - start
+        workers = env.workers
+
+    result = {
+        'steps': num_steps,
+        'seed': seed,
+        'map': map_path,
+        'envs': num_envs,
+        'workers': workers,
+        'cpu_count': os.cpu_count(),
+        'steps_per_second': num_steps * num_envs / total,
+        'steps_per_second_per_env': num_steps / total,
+        'episodes': episodes,
+    }
+    if output:
+        with open(output, 'w') as file:
+            json.dump(result, file, indent=2)
+    print(json.dumps(result))
+    return result
+
+
+if __name__ == '__main__':
+    run_benchmark()
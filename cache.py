@@ -0,0 +1,54 @@
+from collections import OrderedDict
+
+
+class SurfaceCache:
+    def __init__(self, max_items, max_bytes):
+        self.surfaces = OrderedDict()
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.surfaces)
+
+    def get(self, key):
+        surface = self.surfaces.get(key)
+        if surface is None:
+            self.misses += 1
+            return None
+        self.surfaces.move_to_end(key)
+        self.hits += 1
+        return surface
+
+    def put(self, key, surface):
+        # surfaces that would take over a quarter of the budget are returned without being kept
+        if self.get_size(surface) > self.max_bytes // 4:
+            return surface
+        if key in self.surfaces:
+            self.bytes -= self.get_size(self.surfaces.pop(key))
+        self.surfaces[key] = surface
+        self.bytes += self.get_size(surface)
+        while self.surfaces and (len(self.surfaces) > self.max_items or self.bytes > self.max_bytes):
+            _, old = self.surfaces.popitem(last=False)
+            self.bytes -= self.get_size(old)
+            self.evictions += 1
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+        self.bytes = 0
+
+    def reset_stats(self):
+        self.hits, self.misses, self.evictions = 0, 0, 0
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @staticmethod
+    def get_size(surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
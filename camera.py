@@ -0,0 +1,39 @@
+from settings import *
+
+
+class Camera:
+    # projection parameters the renderer reads every frame; the governor trades ray count for frame time
+    def __init__(self, game):
+        self.game = game
+        self.adaptive = RENDER_SCALE_ADAPTIVE
+        # only column widths that tile the screen exactly, so every ray covers whole pixels
+        self.scales = [scale for scale in range(RENDER_SCALE_MIN, RENDER_SCALE_MAX + 1) if WIDTH % scale == 0]
+        self.frame_time = FRAME_TIME_TARGET
+        self.cooldown = RENDER_SCALE_COOLDOWN
+        self.fov = FOV
+        self.half_fov = HALF_FOV
+        self.screen_dist = SCREEN_DIST
+        self.set_scale(SCALE)
+
+    def set_scale(self, scale):
+        self.scale = scale
+        self.num_rays = WIDTH // scale
+        self.half_num_rays = self.num_rays // 2
+        self.delta_angle = self.fov / self.num_rays
+
+    def update(self):
+        # get_rawtime is the work done in the last frame, without the time tick spent waiting for FPS
+        self.frame_time += (self.game.clock.get_rawtime() - self.frame_time) * RENDER_SCALE_SMOOTHING
+        if not self.adaptive:
+            return
+        if self.cooldown:
+            self.cooldown -= 1
+            return
+        index = self.scales.index(self.scale) if self.scale in self.scales else 0
+        if self.frame_time > FRAME_TIME_TARGET and index < len(self.scales) - 1:
+            self.set_scale(self.scales[index + 1])
+        elif self.frame_time < FRAME_TIME_TARGET * 0.7 and index > 0:
+            self.set_scale(self.scales[index - 1])
+        else:
+            return
+        self.cooldown = RENDER_SCALE_COOLDOWN
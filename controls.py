@@ -0,0 +1,140 @@
+import json
+import random
+import pygame as pg
+from settings import *
+
+RECORDED_KEYS = pg.K_w, pg.K_a, pg.K_s, pg.K_d
+
+
+class LiveInput:
+    def next_frame(self):
+        pass
+
+    def next_tick(self):
+        pass
+
+    def get_events(self):
+        return pg.event.get()
+
+    def get_pressed(self):
+        return pg.key.get_pressed()
+
+    def get_pos(self):
+        return pg.mouse.get_pos()
+
+    def set_pos(self, pos):
+        pg.mouse.set_pos(pos)
+
+    def get_rel(self):
+        return pg.mouse.get_rel()
+
+    def close(self):
+        pass
+
+
+class InputRecorder(LiveInput):
+    # one record per simulation tick, the unit a replay plays back; clicks go to the next tick that runs
+    def __init__(self, path):
+        self.path = path
+        self.frames = []
+        self.clicks = []
+
+    def next_tick(self):
+        self.frames.append({'keys': [], 'rel': [0, 0], 'clicks': self.clicks})
+        self.clicks = []
+
+    def get_events(self):
+        events = super().get_events()
+        self.clicks += [event.button for event in events if event.type == pg.MOUSEBUTTONDOWN]
+        return events
+
+    def get_pressed(self):
+        keys = super().get_pressed()
+        self.frames[-1]['keys'] = [key for key in RECORDED_KEYS if keys[key]]
+        return keys
+
+    def get_rel(self):
+        rel = super().get_rel()
+        self.frames[-1]['rel'] = list(rel)
+        return rel
+
+    def close(self):
+        with open(self.path, 'w') as file:
+            json.dump({'frames': self.frames}, file)
+
+
+class PressedKeys:
+    def __init__(self, keys):
+        self.keys = set(keys)
+
+    def __getitem__(self, key):
+        return key in self.keys
+
+
+class InputReplay:
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = -1
+        self.frame = None
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as file:
+            return cls(json.load(file)['frames'])
+
+    @classmethod
+    def generate(cls, num_frames, seed):
+        # scripted stand-in for a recording: hold random movement keys for a while, turn and shoot
+        rng = random.Random(seed)
+        frames = []
+        while len(frames) < num_frames:
+            keys = rng.sample(RECORDED_KEYS, rng.randint(0, 2))
+            rel = rng.randint(-MOUSE_MAX_REL // 2, MOUSE_MAX_REL // 2)
+            for i in range(rng.randint(20, 60)):
+                clicks = [1] if rng.random() < 0.05 else []
+                frames.append({'keys': keys, 'rel': [rel, 0], 'clicks': clicks})
+        return cls(frames[:num_frames])
+
+    def next_frame(self):
+        # replays run one tick per frame, so each frame plays one recorded tick
+        self.index += 1
+        self.frame = self.frames[self.index % len(self.frames)]
+
+    def next_tick(self):
+        pass
+
+    def get_events(self):
+        pg.event.get()  # drain the real queue, only recorded input reaches the game
+        return [pg.event.Event(pg.MOUSEBUTTONDOWN, button=button, pos=(HALF_WIDTH, HALF_HEIGHT))
+                for button in self.frame['clicks']]
+
+    def get_pressed(self):
+        return PressedKeys(self.frame['keys'])
+
+    def get_pos(self):
+        return HALF_WIDTH, HALF_HEIGHT
+
+    def set_pos(self, pos):
+        pass
+
+    def get_rel(self):
+        return tuple(self.frame['rel'])
+
+    def close(self):
+        pass
+
+
+class AgentInput(InputReplay):
+    # input an agent sets once per tick: move and strafe are -1, 0 or 1, turn is mouse pixels, fire is a click
+    def __init__(self):
+        super().__init__([{'keys': [], 'rel': [0, 0], 'clicks': []}])
+
+    def set_action(self, move, strafe, turn, fire):
+        keys = [key for key, pressed in ((pg.K_w, move > 0), (pg.K_s, move < 0), (pg.K_a, strafe < 0),
+                                         (pg.K_d, strafe > 0)) if pressed]
+        self.frames = [{'keys': keys, 'rel': [int(turn), 0], 'clicks': [1] if fire else []}]
+
+    def get_events(self):
+        # no window, so no event queue to drain
+        return [pg.event.Event(pg.MOUSEBUTTONDOWN, button=button, pos=(HALF_WIDTH, HALF_HEIGHT))
+                for button in self.frame['clicks']]
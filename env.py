@@ -0,0 +1,179 @@
+import heapq
+import math
+import os
+import multiprocessing as mp
+from multiprocessing.shared_memory import SharedMemory
+import numpy as np
+from settings import *
+from controls import AgentInput
+from raycasting import RayCasting
+from soak import SoakGame
+
+NPC_FIELDS = 'x', 'y', 'health', 'alive', 'pain', 'visible'
+
+
+def get_observation_shapes():
+    return {'depth': (WIDTH // ENV_SCALE,), 'player': (4,), 'npcs': (ENV_MAX_NPCS, len(NPC_FIELDS))}
+
+
+class EnvGame(SoakGame):
+    # a headless game that also casts the depth rays the agent sees; with its own random generator and
+    # no time budget for the AI scheduler, an episode depends only on the seed and the actions
+    def __init__(self, controls, num_npcs=ENV_NPCS, map_path=MAP_PATH, seed=None):
+        super().__init__(controls, num_npcs, map_path, profile=False, seed=seed)
+        self.scheduler.budget = None
+        self.camera.adaptive = False
+        self.camera.set_scale(ENV_SCALE)
+        self.raycasting = RayCasting(self)
+        self.raycasting.set_workers(1)  # environments run side by side in processes instead
+
+
+class DuumEnv:
+    # gym-style environment: one action per simulation tick, observations are float32 arrays
+    # (depth per ray, player x y angle health, nearest npcs by NPC_FIELDS) written in place
+    def __init__(self, num_npcs=ENV_NPCS, map_path=MAP_PATH, max_steps=ENV_MAX_STEPS, observation=None, seed=None):
+        self.input = AgentInput()
+        self.game = EnvGame(self.input, num_npcs, map_path, seed)
+        self.max_steps = max_steps
+        self.steps = 0
+        self.observation = observation or {name: np.zeros(shape, np.float32)
+                                           for name, shape in get_observation_shapes().items()}
+
+    def reset(self, seed=None):
+        # with a seed the episode replays exactly for the same actions, without one it carries on the game's generator
+        if seed is not None:
+            self.game.rng.seed(seed)
+        # the clock starts over too, gameplay timers and the global trigger depend on its phase
+        self.game.sim_time = 0
+        self.game.global_trigger = False
+        self.game.new_game()
+        self.steps = 0
+        return self.observe()
+
+    def step(self, action):
+        # action is (move, strafe, turn, fire), see AgentInput.set_action
+        game = self.game
+        player, object_handler = game.player, game.object_handler
+        dead = len(object_handler.npc_list) - len(object_handler.npc_grid)
+        health = player.health
+        self.input.set_action(*action)
+        game.run_tick()
+        self.steps += 1
+
+        # the game starts over by itself on a win or a death, player and object_handler are the finished game's
+        kills = len(object_handler.npc_list) - len(object_handler.npc_grid) - dead
+        damage = max(0, health - player.health)
+        ended = game.player is not player
+        died = ended and player.health < 1
+        won = ended and not died
+        if ended:
+            self.steps = 0
+        truncated = self.steps >= self.max_steps
+        reward = (kills * ENV_KILL_REWARD - damage * ENV_DAMAGE_PENALTY
+                  + won * ENV_WIN_REWARD - died * ENV_DEATH_PENALTY)
+        info = {'kills': kills, 'won': won, 'died': died, 'truncated': truncated}
+        return self.observe(), reward, ended or truncated, info
+
+    def observe(self):
+        game = self.game
+        player = game.player
+        player.interpolate(1)
+        game.raycasting.ray_cast()
+        observation = self.observation
+        observation['depth'][:] = game.raycasting.get_ray_casting_arrays()[0]
+        observation['player'][:] = player.x, player.y, player.angle, player.health
+        npcs = heapq.nsmallest(ENV_MAX_NPCS, game.object_handler.npc_list,
+                               key=lambda npc: (npc.x - player.x) ** 2 + (npc.y - player.y) ** 2)
+        observation['npcs'][:] = 0
+        if npcs:
+            observation['npcs'][:len(npcs)] = [(npc.x, npc.y, npc.health, npc.alive, npc.pain, npc.ray_cast_value)
+                                               for npc in npcs]
+        return observation
+
+
+def get_arrays(buffers, num_envs):
+    return {name: np.ndarray((num_envs, *shape), np.float32, buffer=buffers[name].buf)
+            for name, shape in get_observation_shapes().items()}
+
+
+def run_worker(connection, buffers, num_envs, first, last, num_npcs, map_path, max_steps):
+    # steps environments first to last, each writing its observations into its rows of the shared buffers
+    arrays = get_arrays(buffers, num_envs)
+    envs = [DuumEnv(num_npcs, map_path, max_steps, {name: array[i] for name, array in arrays.items()})
+            for i in range(first, last)]
+    while True:
+        command, data = connection.recv()
+        if command == 'reset':
+            for i, env in enumerate(envs):
+                env.reset(None if data is None else data + i)
+            connection.send(None)
+        elif command == 'step':
+            results = []
+            for env, action in zip(envs, data):
+                observation, reward, done, info = env.step(action)
+                if done and not (info['won'] or info['died']):
+                    env.reset()  # wins and deaths have already started over
+                results.append((reward, done, info))
+            connection.send(results)
+        else:
+            break
+    del envs, arrays
+    connection.close()
+
+
+class VectorEnv:
+    # num_envs environments split over worker processes; observations are (num_envs, ...) arrays in
+    # shared memory that every reset and step overwrites, done environments start over by themselves
+    def __init__(self, num_envs, workers=None, num_npcs=ENV_NPCS, map_path=MAP_PATH, max_steps=ENV_MAX_STEPS):
+        self.num_envs = num_envs
+        self.workers = min(num_envs, workers or os.cpu_count() or 1)
+        self.buffers = {name: SharedMemory(create=True, size=num_envs * math.prod(shape) * 4)
+                        for name, shape in get_observation_shapes().items()}
+        self.observations = get_arrays(self.buffers, num_envs)
+        self.bounds = [num_envs * i // self.workers for i in range(self.workers + 1)]
+        self.connections, self.processes = [], []
+        for first, last in zip(self.bounds[:-1], self.bounds[1:]):
+            connection, worker_connection = mp.Pipe()
+            process = mp.Process(target=run_worker, daemon=True,
+                                 args=(worker_connection, self.buffers, num_envs, first, last,
+                                       num_npcs, map_path, max_steps))
+            process.start()
+            worker_connection.close()
+            self.connections.append(connection)
+            self.processes.append(process)
+
+    def reset(self, seed=None):
+        # environment i is seeded with seed + i, so its episodes do not depend on the number of workers
+        for connection, first in zip(self.connections, self.bounds):
+            connection.send(('reset', None if seed is None else seed + first))
+        [connection.recv() for connection in self.connections]
+        return self.observations
+
+    def step(self, actions):
+        for connection, first, last in zip(self.connections, self.bounds, self.bounds[1:]):
+            connection.send(('step', actions[first:last]))
+        results = [result for connection in self.connections for result in connection.recv()]
+        rewards, dones, infos = zip(*results)
+        return self.observations, np.array(rewards, np.float32), np.array(dones), list(infos)
+
+    def close(self):
+        if not self.processes:
+            return
+        for connection, process in zip(self.connections, self.processes):
+            connection.send(('close', None))
+            process.join()
+            connection.close()
+        self.processes = []
+        self.observations = None
+        for buffer in self.buffers.values():
+            buffer.unlink()
+            try:
+                buffer.close()
+            except BufferError:
+                pass  # observation arrays still held elsewhere keep the mapping alive
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
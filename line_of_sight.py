@@ -0,0 +1,86 @@
+from settings import *
+from raycasting import RayCasting
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class LineOfSight:
+    def __init__(self, game):
+        self.game = game
+        self.visible = {}
+        self.backend = RAY_CASTING_BACKEND if np is not None else 'python'
+        if self.backend == 'numpy':
+            self.grid = np.frombuffer(self.game.map.grid, dtype=np.uint8).reshape(self.game.map.rows, -1)
+
+    def is_visible(self, npc):
+        # results are computed once per tick; npcs added since then are cast on demand
+        if npc not in self.visible:
+            self.visible[npc] = npc.ray_cast_player_npc()
+        return self.visible[npc]
+
+    def update(self, npc_list):
+        npcs = [npc for npc in npc_list if npc.alive]
+        if self.backend == 'numpy' and npcs:
+            self.visible = dict(zip(npcs, self.cast_numpy(npcs).tolist()))
+        else:
+            [npc.find_player() for npc in npcs]  # the scalar ray follows theta from locate
+            self.visible = {npc: npc.ray_cast_player_npc() for npc in npcs}
+
+    def walk_to_npcs(self, xs, ys, depths, npc_x, npc_y):
+        # distance to the first npc tile or wall met along MAX_DEPTH grid lines, 0 when neither is met
+        rows, cols = self.grid.shape
+        tile_x = xs[:, :MAX_DEPTH].astype(np.int64)
+        tile_y = ys[:, :MAX_DEPTH].astype(np.int64)
+        inside = (tile_x >= 0) & (tile_x < cols) & (tile_y >= 0) & (tile_y < rows)
+        wall = inside & (self.grid[tile_y.clip(0, rows - 1), tile_x.clip(0, cols - 1)] > 0)
+        npc = (tile_x == npc_x[:, None]) & (tile_y == npc_y[:, None])
+
+        event = npc | wall
+        found = event.any(axis=1)
+        step = event.argmax(axis=1)
+        index = np.arange(len(xs))
+        depth = np.where(found, depths[index, step], 0)
+        hit_npc = found & npc[index, step]
+        return np.where(hit_npc, depth, 0), np.where(found & ~hit_npc, depth, 0)
+
+    def cast_numpy(self, npcs):
+        player = self.game.player
+        ox, oy = player.pos
+        x_map, y_map = player.map_pos
+        npc_x = np.array([npc.x for npc in npcs])
+        npc_y = np.array([npc.y for npc in npcs])
+        npc_map_x, npc_map_y = npc_x.astype(np.int64), npc_y.astype(np.int64)
+
+        ray_angle = np.arctan2(npc_y - oy, npc_x - ox)
+        sin_a = np.sin(ray_angle)
+        cos_a = np.cos(ray_angle)
+        walk = RayCasting.walk
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # horizontals
+            y_hor = np.where(sin_a > 0, y_map + 1, y_map - 1e-6)
+            dy = np.where(sin_a > 0, 1.0, -1.0)
+            depth_hor = (y_hor - oy) / sin_a
+            x_hor = ox + depth_hor * cos_a
+            delta_depth = dy / sin_a
+            dx = delta_depth * cos_a
+            player_dist_h, wall_dist_h = self.walk_to_npcs(
+                walk(x_hor, dx), walk(y_hor, dy), walk(depth_hor, delta_depth), npc_map_x, npc_map_y)
+
+            # verticals
+            x_vert = np.where(cos_a > 0, x_map + 1, x_map - 1e-6)
+            dx = np.where(cos_a > 0, 1.0, -1.0)
+            depth_vert = (x_vert - ox) / cos_a
+            y_vert = oy + depth_vert * sin_a
+            delta_depth = dx / cos_a
+            dy = delta_depth * sin_a
+            player_dist_v, wall_dist_v = self.walk_to_npcs(
+                walk(x_vert, dx), walk(y_vert, dy), walk(depth_vert, delta_depth), npc_map_x, npc_map_y)
+
+        player_dist = np.maximum(player_dist_v, player_dist_h)
+        wall_dist = np.maximum(wall_dist_v, wall_dist_h)
+        same_tile = (npc_map_x == x_map) & (npc_map_y == y_map)
+        return same_tile | ((0 < player_dist) & (player_dist < wall_dist)) | (wall_dist == 0)
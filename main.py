@@ -1,9 +1,12 @@
 import pygame as pg
+import argparse
+import random
 import sys
 
 from settings import *  # Import settings such as resolution, FPS, etc.
 from map import *  # Import the map system
 from player import *  # Import player-related code
+from camera import *  # Import the live camera and its render scale governor
 from raycasting import *  # Import raycasting functionality
 from object_renderer import *  # Import the object rendering system
 from sprite_object import *  # Import sprite handling code
@@ -11,60 +14,140 @@ from object_handler import *  # Import object management logic
 from weapon import *  # Import weapon system
 from sound import *  # Import sound handling
 from pathfinding import *  # Import pathfinding algorithms
+from ai_scheduler import *  # Import the NPC AI level of detail scheduler
+from controls import *  # Import live, recorded and replayed input sources
+from profiler import *  # Import the frame profiler
+from assets import assets  # Import the shared asset registry
 
 # Game class to manage the game loop, events, and objects
 class Game:
-    def __init__(self):
+    headless = False  # Headless games get image stubs instead of decoded images
+
+    def __init__(self, controls=None, profile=PROFILER_ENABLED, map_path=MAP_PATH, asset_pack=ASSET_PACK, seed=None):
         # Initialize pygame and set up the game environment
         pg.init()  # Initialize all pygame modules
+        self.input = controls or LiveInput()  # Source of keyboard, mouse and click input
+        self.rng = random.Random(seed)  # This game's own source of randomness (spawns, NPC attack rolls)
+        self.profiler = FrameProfiler(self, profile)  # Times each stage of every frame
         pg.mouse.set_visible(False)  # Hide the system mouse cursor
         self.screen = pg.display.set_mode(RES)  # Set the display/window resolution
         pg.event.set_grab(True)  # Lock the mouse to the game window
         self.clock = pg.time.Clock()  # Create a clock to manage frame rate
         self.delta_time = 1  # Delta time to keep track of frame-to-frame time
-        self.global_trigger = False  # A global trigger for event handling
-        self.global_event = pg.USEREVENT + 0  # Custom user event
-        pg.time.set_timer(self.global_event, 40)  # Trigger global event every 40 ms
-        self.new_game()  # Start a new game
-
-    def new_game(self):
-        # Initialize the main components of the game (map, player, etc.)
-        self.map = Map(self)  # Initialize the game map
-        self.player = Player(self)  # Initialize the player
+        self.sim_time = 0  # Milliseconds of game time simulated so far
+        self.accumulator = 0  # Frame time not yet consumed by simulation ticks
+        self.alpha = 0  # How far rendering is between the last two simulation ticks (0 to 1)
+        self.global_trigger = False  # A global trigger raised every GLOBAL_TRIGGER_TIME of game time
+        if asset_pack:
+            assets.open_pack()  # Read images from the baked asset pack, if it is up to date
+        assets.preload(self.draw_loading_screen)  # Otherwise start decoding every asset on worker threads
+        # Components holding loaded assets and caches are built once and kept between games
+        self.map = Map(self, map_path)  # Initialize the game map once, it never changes between games
+        self.camera = Camera(self)  # Projection parameters, adjusted every frame to hold the frame time
         self.object_render = ObjectRenderer(self)  # Initialize the object renderer
         self.raycasting = RayCasting(self)  # Initialize the raycasting system
-        self.object_handler = ObjectHandler(self)  # Handle in-game objects (e.g. enemies, items)
         self.weapon = Weapon(self)  # Initialize the weapon system
         self.sound = Sound(self)  # Initialize sound effects and background music
         self.pathfinding = PathFinding(self)  # Initialize the pathfinding system (e.g. AI navigation)
+        self.scheduler = AIScheduler(self)  # Decides which NPCs think on each tick
+        self.new_game()  # Start a new game
+        if asset_pack and assets.pack is None:
+            assets.bake()  # Bake a fresh asset pack so the next start skips decoding
+        assets.finish_preload()  # Drop decodes that were never asked for
+
+    def new_game(self):
+        # Reset the simulation state (player, enemies, etc.), loaded assets are reused
+        self.player = Player(self)  # Initialize the player
+        self.object_handler = ObjectHandler(self)  # Handle in-game objects (e.g. enemies, items)
+        self.weapon.reset()  # Put the weapon back in its ready state
+        self.pathfinding.reset()  # Forget paths and occupancy from the previous game
+        self.scheduler.reset()  # Forget when the previous game's NPCs last thought
         pg.mixer.music.play(-1)  # Play background music indefinitely
 
-    # Update all game objects (called every frame)
+    # Advance the simulation by one fixed tick of SIM_DT milliseconds
+    def step(self):
+        section = self.profiler.section  # Time each stage of the tick
+        self.sim_time += SIM_DT  # Game time moves on by exactly one tick
+        self.input.next_tick()  # Input is sampled, and recorded, once per tick
+        # Raise the global trigger on ticks that cross a GLOBAL_TRIGGER_TIME boundary
+        self.global_trigger = self.sim_time // GLOBAL_TRIGGER_TIME != (self.sim_time - SIM_DT) // GLOBAL_TRIGGER_TIME
+        self.player.save_state()  # Remember where things were, rendering interpolates from there
+        self.object_handler.save_state()
+        with section('player'):
+            self.player.update()  # Update the player state (movement, shooting, etc.)
+        with section('npc_logic'):
+            self.object_handler.step()  # Run enemy AI, pathfinding and the win check
+        with section('weapon'):
+            self.weapon.update()  # Update the weapon (shooting, reloading, etc.)
+
+    # Run the simulation ticks that are due, then prepare the frame (called every frame)
     def update(self):
-        self.player.update()  # Update the player state (movement, shooting, etc.)
-        self.raycasting.update()  # Perform raycasting to detect walls, objects, etc.
-        self.object_handler.update()  # Update the state of all game objects
-        self.weapon.update()  # Update the weapon (shooting, reloading, etc.)
-        pg.display.flip()  # Update the display with new frame content
-        self.delta_time = self.clock.tick(FPS)  # Control frame rate and calculate delta time
+        section = self.profiler.section  # Time each stage of the update
+        with section('simulation'):
+            self.accumulator += self.delta_time  # Bank the time the last frame took
+            steps = 0
+            while self.accumulator >= SIM_DT and steps < MAX_SIM_STEPS:
+                self.step()  # Consume the banked time one fixed tick at a time
+                self.accumulator -= SIM_DT
+                steps += 1
+            self.accumulator = min(self.accumulator, SIM_DT)  # Drop time we fell too far behind on
+        self.alpha = self.accumulator / SIM_DT  # Fraction of the next tick that has already passed
+        self.player.interpolate(self.alpha)  # Blend the player between its last two ticks
+        self.object_handler.interpolate(self.alpha)  # Same for every moving object
+        self.camera.update()  # Pick this frame's ray count from the recent frame times
+        with section('raycasting'):
+            self.raycasting.update()  # Perform raycasting from the interpolated view
+        with section('object_handler'):
+            self.object_handler.update()  # Project sprites and animate decorations
+        with section('flip'):
+            pg.display.flip()  # Update the display with new frame content
+        self.tick()  # Control frame rate and calculate delta time
         pg.display.set_caption(f'{self.clock.get_fps() :.1f}')  # Display the current FPS in the window title
 
+    # Draw a progress bar while assets are being decoded
+    def draw_loading_screen(self, done, total):
+        pg.event.pump()  # Keep the window responsive while loading
+        bar = pg.Rect(WIDTH // 4, HALF_HEIGHT - 10, WIDTH // 2, 20)  # Outline of the progress bar
+        self.screen.fill('black')
+        pg.draw.rect(self.screen, 'darkred', (bar.x, bar.y, bar.width * done // total, bar.height))
+        pg.draw.rect(self.screen, 'darkgray', bar, 2)
+        pg.display.flip()
+
+    # Advance the clock by one frame
+    def tick(self):
+        self.delta_time = self.clock.tick(FPS)  # Control frame rate and calculate delta time
+
+    # Milliseconds of game time simulated so far, used by all gameplay timers
+    def get_ticks(self):
+        return self.sim_time
+
+    # Pause the game for a number of milliseconds (e.g. on the game over screen)
+    def delay(self, ms):
+        pg.time.delay(ms)
+
     # Draw game objects to the screen (called every frame)
     def draw(self):
-        self.object_render.draw()  # Render all visible objects in the scene
-        self.weapon.draw()  # Draw the player's weapon on screen
+        with self.profiler.section('object_renderer'):
+            self.object_render.draw()  # Render all visible objects in the scene
+        with self.profiler.section('weapon_draw'):
+            self.weapon.draw()  # Draw the player's weapon on screen
+        self.profiler.draw_overlay()  # Draw the stage timings on top, if enabled
+        self.profiler.end_frame()  # The frame is complete
 
     # Handle all game events (input, quit, etc.)
     def check_events(self):
-        self.global_trigger = False  # Reset global trigger before checking events
-        for event in pg.event.get():  # Loop through all events
+        self.profiler.begin_frame()  # Every frame starts by checking events
+        self.input.next_frame()  # Start a new frame of input
+        for event in self.input.get_events():  # Loop through all events
             if event.type == pg.QUIT or (event.type == pg.KEYDOWN and event.key == pg.K_ESCAPE):
                 # Quit the game if the user closes the window or presses ESC
+                self.input.close()  # Save the input recording, if there is one
                 pg.quit()
                 sys.exit(0)
-            elif event.type == self.global_event:
-                # Trigger custom global event (used for timed updates)
-                self.global_trigger = True
+            elif event.type == pg.KEYDOWN and event.key == pg.K_F3:
+                self.profiler.show_overlay = not self.profiler.show_overlay  # Toggle the profiler overlay
+            elif event.type == pg.KEYDOWN and event.key == pg.K_F4 and self.profiler.enabled:
+                self.profiler.export_chrome_trace()  # Save the recent frames as a trace file
             # Check for specific player-related events (e.g. firing weapon)
             self.player.single_fire_event(event)
 
@@ -77,5 +160,54 @@ class Game:
 
 # Run the game if this script is executed directly
 if __name__ == "__main__":
-    game = Game()  # Create a Game instance
-    game.run()  # Start the main game loop
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bench', action='store_true', help='run a headless benchmark and print JSON results')
+    parser.add_argument('--frames', type=int, default=BENCH_FRAMES, help='number of frames to benchmark')
+    parser.add_argument('--seed', type=int, default=BENCH_SEED, help='random seed for the benchmark')
+    parser.add_argument('--replay', help='input recording to replay in the benchmark')
+    parser.add_argument('--record', help='record input to this file while playing')
+    parser.add_argument('--output', help='also write the benchmark JSON to this file')
+    parser.add_argument('--profile', action='store_true', help='enable the frame profiler and its overlay')
+    parser.add_argument('--trace', help='write a Chrome trace of the last benchmark frames to this file')
+    parser.add_argument('--startup', action='store_true', help='measure cold and warm startup time as JSON')
+    parser.add_argument('--bake', action='store_true', help='bake the asset pack and exit')
+    parser.add_argument('--map', default=MAP_PATH, help='play or benchmark this map file instead of the built-in map')
+    parser.add_argument('--make-map', metavar='PATH', help='generate a random map file and exit')
+    parser.add_argument('--map-size', type=int, default=MAP_SIZE, help='tiles per side of the generated map')
+    parser.add_argument('--soak', action='store_true',
+                        help='run the NPC AI headless for --frames ticks and print JSON results')
+    parser.add_argument('--npcs', type=int, default=SOAK_NPCS, help='number of NPCs the soak spawns')
+    parser.add_argument('--envs', type=int,
+                        help='step this many gym-style environments in parallel for --frames steps and print JSON results')
+    parser.add_argument('--env-workers', type=int, help='worker processes for --envs (default: one per core)')
+    parser.add_argument('--scaling', type=int, nargs='*', metavar='WORKERS',
+                        help='benchmark ray casting with each number of worker threads (default: powers of two up to the core count)')
+    args = parser.parse_args()
+
+    if args.bench:
+        from bench import run_benchmark
+        run_benchmark(args.frames, args.seed, args.replay, args.output, args.trace, args.map)
+    elif args.soak:
+        from bench import run_soak
+        run_soak(args.frames, args.seed, args.npcs, args.map, args.output)
+    elif args.envs:
+        from bench import run_env_benchmark
+        run_env_benchmark(args.frames, args.seed, args.envs, args.env_workers, args.map, args.output)
+    elif args.scaling is not None:
+        from bench import run_scaling_benchmark
+        run_scaling_benchmark(args.frames, args.seed, args.scaling, args.output)
+    elif args.startup:
+        from bench import run_startup_benchmark
+        run_startup_benchmark(args.output)
+    elif args.make_map:
+        from map_file import generate_map, write_map
+        grid, spawns, player_pos = generate_map(args.map_size, args.seed)
+        write_map(args.make_map, args.map_size, args.map_size, grid, spawns, player_pos)
+    elif args.bake:
+        from bench import get_benchmark_game
+        get_benchmark_game(None, args.seed, asset_pack=False)  # Starting a game decodes every asset from source
+        assets.bake()  # Then write them all to a fresh pack
+    else:
+        game = Game(InputRecorder(args.record) if args.record else None,
+                    args.profile or PROFILER_ENABLED, args.map)  # Create a Game instance
+        game.run()  # Start the main game loop
\ No newline at end of file
@@ -1,4 +1,6 @@
 import pygame as pg
+from settings import *
+from map_file import MapFile
 
 _ = False # This is a shortcut to represent empty spaces in the mini-map
 mini_map = [ # Define the layout of the mini-map using a 2D list
@@ -38,19 +40,54 @@ mini_map = [ # Define the layout of the mini-map using a 2D list
 
 
 class Map:
-    def __init__(self, game):
+    def __init__(self, game, path=MAP_PATH):
         self.game = game # Link map class to the game's instance
-        self.mini_map = mini_map # Assign the mini map layout above to this instance
         self.world_map = {} # Dictionary to store the world map (Converted from Mini Map)
-        self.rows = len(self.mini_map) # number of rows in the mini map
-        self.cols = len(self.mini_map[0]) # number of columns in the mini map
-        self.get_map() # Call the method to process and store the map information
+        self.file = MapFile(path) if path else None # Memory-mapped map file, None for the built-in map
+        if self.file is None:
+            self.mini_map = mini_map # Assign the mini map layout above to this instance
+            self.rows = len(self.mini_map) # number of rows in the mini map
+            self.cols = len(self.mini_map[0]) # number of columns in the mini map
+            self.grid = bytearray(self.rows * self.cols) # Dense row-major grid of tile IDs, 0 is open space
+            self.player_pos = PLAYER_POS # Where the player starts
+            self.chunk_size = MAP_CHUNK_SIZE # Tiles per side of a chunk
+            self.get_map() # Call the method to process and store the map information
+        else:
+            # Large maps skip the world map dictionary, the grid is read straight from the file
+            self.rows, self.cols = self.file.rows, self.file.cols # Size of the map in tiles
+            self.grid = self.file.grid # Read-only view of the tile IDs inside the mapped file
+            self.player_pos = tuple(self.file.player_pos) # Where the player starts
+            self.chunk_size = self.file.chunk_size # Tiles per side of a chunk
 
     def get_map(self):
         for j, row in enumerate(self.mini_map): # Loop through the rows
             for i, value in enumerate(row): # Loop through each value in the row
                 if value: # if the value is not false or not an open space
                     self.world_map[(i, j)] = value # Add it to the world map with it's coordinates as key
+                    self.grid[j * self.cols + i] = value # Store the tile ID in the dense grid as well
+
+    # Return the tile ID at (x, y), tiles outside the map count as open space
+    def get_tile(self, x, y):
+        if 0 <= x < self.cols and 0 <= y < self.rows:
+            return self.grid[y * self.cols + x]
+        return 0
+
+    # Return the chunk holding tile (x, y)
+    def get_chunk(self, x, y):
+        return x // self.chunk_size, y // self.chunk_size
+
+    # Return the (x, y, kind) spawns of a chunk, the built-in map spawns at random instead
+    def get_spawns(self, chunk_x, chunk_y):
+        return self.file.get_spawns(chunk_x, chunk_y) if self.file is not None else []
+
+    # Number of NPCs the map's spawn table holds
+    @property
+    def num_npcs(self):
+        return self.file.num_npcs if self.file is not None else 0
+
+    # Return True if there is a wall at (x, y)
+    def is_wall(self, x, y):
+        return 0 <= x < self.cols and 0 <= y < self.rows and self.grid[y * self.cols + x] != 0
 
     # Method to draw the map using pygame
     def draw(self):
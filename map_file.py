@@ -0,0 +1,91 @@
+import mmap
+import os
+import random
+import struct
+from settings import *
+
+MAP_MAGIC = b'DUUMMAP\x00'
+MAP_VERSION = 1
+HEADER = struct.Struct('<8sIIIIIIff')  # magic, version, cols, rows, chunk size, spawns, npc spawns, player x, y
+SPAWN = struct.Struct('<ffI')  # x, y, kind
+OFFSET = struct.Struct('<I')
+NPC_KINDS = 'soldier', 'caco_demon', 'cyber_demon'
+SPAWN_KINDS = NPC_KINDS + ('green_light', 'red_light')
+
+
+def write_map(path, cols, rows, grid, spawns, player_pos, chunk_size=MAP_CHUNK_SIZE):
+    # header, tile grid, where each chunk's spawns start in the spawn table, then the spawns sorted by chunk
+    chunks_x, chunks_y = -(-cols // chunk_size), -(-rows // chunk_size)
+
+    def get_chunk(spawn):
+        x, y, kind = spawn
+        return int(y) // chunk_size * chunks_x + int(x) // chunk_size
+
+    spawns = sorted(spawns, key=get_chunk)
+    offsets = [0] * (chunks_x * chunks_y + 1)
+    for spawn in spawns:
+        offsets[get_chunk(spawn) + 1] += 1
+    for i in range(1, len(offsets)):
+        offsets[i] += offsets[i - 1]
+    num_npcs = sum(kind in NPC_KINDS for x, y, kind in spawns)
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        file.write(HEADER.pack(MAP_MAGIC, MAP_VERSION, cols, rows, chunk_size, len(spawns), num_npcs, *player_pos))
+        file.write(bytes(grid))
+        file.write(b''.join(OFFSET.pack(offset) for offset in offsets))
+        file.write(b''.join(SPAWN.pack(x, y, SPAWN_KINDS.index(kind)) for x, y, kind in spawns))
+    os.replace(temp_path, path)
+
+
+def generate_map(size=MAP_SIZE, seed=0):
+    # walled square of scattered wall segments, with npcs and lights spread over the open tiles
+    rng = random.Random(seed)
+    grid = bytearray(size * size)
+    for i in range(size):
+        grid[i] = grid[(size - 1) * size + i] = grid[i * size] = grid[i * size + size - 1] = 1
+    for segment in range(size * size // 40):
+        x, y = rng.randrange(1, size - 1), rng.randrange(1, size - 1)
+        dx, dy = rng.choice(((1, 0), (0, 1)))
+        texture = rng.randint(1, 5)
+        for step in range(rng.randint(2, 6)):
+            if 0 < x < size - 1 and 0 < y < size - 1 and max(x, y) > 4:
+                grid[y * size + x] = texture
+            x, y = x + dx, y + dy
+
+    spawns = []
+    for y in range(1, size - 1):
+        for x in range(1, size - 1):
+            if grid[y * size + x] or max(x, y) < 10:
+                continue
+            roll = rng.random()
+            if roll < 1 / 60:
+                spawns.append((x + 0.5, y + 0.5, rng.choices(NPC_KINDS, (70, 20, 10))[0]))
+            elif roll < 1 / 60 + 1 / 200:
+                spawns.append((x + 0.5, y + 0.5, rng.choice(SPAWN_KINDS[len(NPC_KINDS):])))
+    return grid, spawns, (1.5, 1.5)
+
+
+class MapFile:
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self.cols, self.rows, self.chunk_size,
+         self.num_spawns, self.num_npcs, *self.player_pos) = HEADER.unpack_from(self.data)
+        if magic != MAP_MAGIC or version != MAP_VERSION:
+            raise ValueError(f'{path} is not a version {MAP_VERSION} map')
+        self.chunks_x, self.chunks_y = -(-self.cols // self.chunk_size), -(-self.rows // self.chunk_size)
+        # the tile grid is a view into the mapping, pages are only read in as rays and paths reach them
+        self.grid = memoryview(self.data)[HEADER.size:HEADER.size + self.rows * self.cols]
+        self.offsets = HEADER.size + self.rows * self.cols
+        self.spawns = self.offsets + OFFSET.size * (self.chunks_x * self.chunks_y + 1)
+
+    def get_spawns(self, chunk_x, chunk_y):
+        # (x, y, kind) of every spawn in one chunk
+        if not (0 <= chunk_x < self.chunks_x and 0 <= chunk_y < self.chunks_y):
+            return []
+        index = chunk_y * self.chunks_x + chunk_x
+        first, = OFFSET.unpack_from(self.data, self.offsets + OFFSET.size * index)
+        last, = OFFSET.unpack_from(self.data, self.offsets + OFFSET.size * (index + 1))
+        return [(x, y, SPAWN_KINDS[kind]) for x, y, kind in
+                SPAWN.iter_unpack(self.data[self.spawns + first * SPAWN.size:self.spawns + last * SPAWN.size])]
@@ -1,5 +1,4 @@
 from sprite_object import *
-from random import randint, random
 
 class NPC(AnimatedSprite):
     def __init__(self, game, path='resources/sprites/npc/soldier/0.png', pos=(10.5, 5.5),
@@ -11,7 +10,7 @@ class NPC(AnimatedSprite):
         self.pain_images = self.get_images(self.path + '/pain')
         self.walk_images = self.get_images(self.path + '/walk')
 
-        self.attack_dist = randint(3, 6)
+        self.attack_dist = game.rng.randint(3, 6)
         self.speed = 0.03
         self.size = 20
         self.health = 100
@@ -24,24 +23,32 @@ class NPC(AnimatedSprite):
         self.player_search_trigger = False
 
     def update(self):
-        self.check_animation_time()
         self.get_sprite()
+
+    def find_player(self):
+        # where the player is as of this tick, for line of sight, attack range and hit tests
+        player = self.player
+        self.locate(self.x, self.y, player.x, player.y, player.angle)
+
+    def step(self):
+        self.check_animation_time()
         self.run_logic()
 
     def check_wall(self, x, y):
-        return (x, y) not in self.game.map.world_map
+        return not self.game.map.is_wall(x, y)
     
     def check_wall_collision(self, dx, dy):
         if self.check_wall(int(self.x + dx * self.size), int(self.y)):
             self.x += dx
         if self.check_wall(int(self.x), int(self.y + dy * self.size)):
             self.y += dy
+        self.game.object_handler.npc_grid.move(self, self.map_pos)
 
     def movement(self):
         next_pos = self.game.pathfinding.get_path(self.map_pos, self.game.player.map_pos)
         next_x, next_y = next_pos
 
-        if next_pos not in self.game.object_handler.npc_positions:
+        if next_pos not in self.game.object_handler.npc_grid:
             angle = math.atan2(next_y + 0.5 - self.y, next_x + 0.5 - self.x)
             dx = math.cos(angle) * self.speed
             dy = math.sin(angle) * self.speed
@@ -49,16 +56,15 @@ class NPC(AnimatedSprite):
 
     def attack(self):
         if self.animation_trigger:
-            self.game.sound.npc_shot.play()
-            if random() < self.accuracy:
+            self.game.sound.play_at(self.game.sound.npc_shot, (self.x, self.y))
+            if self.game.rng.random() < self.accuracy:
                 self.game.player.get_damage(self.attack_damage)
 
     def animate_death(self):
         if not self.alive:
             if self.game.global_trigger and self.frame_counter < len(self.death_images) - 1:
-                self.death_images.rotate(-1)
-                self.image = self.death_images[0]
                 self.frame_counter += 1
+                self.image = self.death_images[self.frame_counter]
 
     def animate_pain(self):
         self.animate(self.pain_images)
@@ -68,7 +74,7 @@ class NPC(AnimatedSprite):
     def check_hit_in_npc(self):
         if self.ray_cast_value and self.game.player.shot:
             if HALF_WIDTH - self.sprite_half_width < self.screen_x < HALF_WIDTH + self.sprite_half_width:
-                self.game.sound.npc_pain.play()
+                self.game.sound.play_at(self.game.sound.npc_pain, (self.x, self.y))
                 self.game.player.shot = False
                 self.pain = True
                 self.health -= self.game.weapon.damage 
@@ -77,11 +83,12 @@ class NPC(AnimatedSprite):
     def check_health(self):
         if self.health < 1:
             self.alive = False
-            self.game.sound.npc_death.play()
+            self.game.object_handler.npc_grid.remove(self)
+            self.game.sound.play_at(self.game.sound.npc_death, (self.x, self.y))
 
     def run_logic(self):
         if self.alive:
-            self.ray_cast_value = self.ray_cast_player_npc()
+            self.ray_cast_value = self.game.object_handler.line_of_sight.is_visible(self)
             self.check_hit_in_npc()
 
             if self.pain:
@@ -121,11 +128,14 @@ class NPC(AnimatedSprite):
 
         ox, oy = self.game.player.pos
         x_map, y_map = self.game.player.map_pos
+        npc_x, npc_y = self.map_pos
+        is_wall = self.game.map.is_wall
 
         ray_angle = self.theta
 
-        sin_a = math.sin(ray_angle)
-        cos_a = math.cos(ray_angle)
+        # an npc level with the player (both on tile centres) would divide by zero below
+        sin_a = math.sin(ray_angle) or 1e-6
+        cos_a = math.cos(ray_angle) or 1e-6
 
         y_hor, dy = (y_map + 1, 1) if sin_a > 0 else (y_map - 1e-6, -1)
 
@@ -136,11 +146,11 @@ class NPC(AnimatedSprite):
         dx = delta_depth * cos_a
 
         for i in range(MAX_DEPTH):
-            tile_hor = int(x_hor), int(y_hor)
-            if tile_hor == self.map_pos:
+            tile_x, tile_y = int(x_hor), int(y_hor)
+            if tile_x == npc_x and tile_y == npc_y:
                 player_dist_h = depth_hor
                 break
-            if tile_hor in self.game.map.world_map:
+            if is_wall(tile_x, tile_y):
                 wall_dist_h = depth_hor
                 break
             x_hor += dx
@@ -157,11 +167,11 @@ class NPC(AnimatedSprite):
         dy = delta_depth * sin_a
 
         for i in range(MAX_DEPTH):
-            tile_vert = int(x_vert), int(y_vert)
-            if tile_vert == self.map_pos:
+            tile_x, tile_y = int(x_vert), int(y_vert)
+            if tile_x == npc_x and tile_y == npc_y:
                 player_dist_v = depth_vert
                 break
-            if tile_vert in self.game.map.world_map:
+            if is_wall(tile_x, tile_y):
                 wall_dist_v = depth_vert
                 break
             x_vert += dx
@@ -177,7 +187,7 @@ class NPC(AnimatedSprite):
     
     def draw_ray_cast(self):
         pg.draw.circle(self.game.screen, 'red', (100 * self.x, 100 * self.y), 15)
-        if self.ray_cast_player_npc():
+        if self.game.object_handler.line_of_sight.is_visible(self):
             pg.draw.line(self.game.screen, 'orange', (100 * self.game.player.x, 100 * self.game.player.y),
                          (100 * self.x, 100 * self.y), 2)
 
@@ -1,10 +1,11 @@
 from sprite_object import *
 from npc import *
-from random import choices, randrange
+from line_of_sight import LineOfSight
+from spatial_index import SpatialGrid
 
 
 class ObjectHandler:
-    def __init__(self, game):
+    def __init__(self, game, enemies=None):
         self.game = game
         self.sprite_list = []
         self.npc_list = []
@@ -13,14 +14,26 @@ class ObjectHandler:
         self.anim_sprite_path = 'resources/sprites/animated_sprites/'
         add_sprite = self.add_sprite
         add_npc = self.add_npc
-        self.npc_positions = {}
+        self.npc_grid = SpatialGrid()  # tiles of living npcs
+        self.line_of_sight = LineOfSight(game)
 
         # spawn npc
-        self.enemies = 20  # npc count
+        self.enemies = 20 if enemies is None else enemies  # npc count
         self.npc_types = [SoldierNPC, CacoDemonNPC, CyberDemonNPC]
         self.weights = [70, 20, 10]
         self.restricted_area = {(i, j) for i in range(10) for j in range(10)}
+        self.spawn_types = {'soldier': SoldierNPC, 'caco_demon': CacoDemonNPC, 'cyber_demon': CyberDemonNPC}
+        self.spawned_chunks = set()  # map chunks whose spawns have been brought to life
+        self.player_chunk = None
+        # map files spawn what they hold as the player gets near, unless a fixed npc count is asked for
+        self.spawn_table = game.map.file is not None and enemies is None
+        self.npcs_left = game.map.num_npcs if self.spawn_table else 0  # npcs in the map file that have not spawned yet
+        if self.spawn_table:
+            self.spawn_nearby()
+            return
         self.spawn_npc()
+        if game.map.file is not None:
+            return  # the layout below is the built-in map's
 
         # sprite map
         add_sprite(AnimatedSprite(game))
@@ -58,27 +71,73 @@ class ObjectHandler:
 
     def spawn_npc(self):
         for i in range(self.enemies):
-                npc = choices(self.npc_types, self.weights)[0]
-                pos = x, y = randrange(self.game.map.cols), randrange(self.game.map.rows)
-                while (pos in self.game.map.world_map) or (pos in self.restricted_area):
-                    pos = x, y = randrange(self.game.map.cols), randrange(self.game.map.rows)
+                rng = self.game.rng
+                npc = rng.choices(self.npc_types, self.weights)[0]
+                pos = x, y = rng.randrange(self.game.map.cols), rng.randrange(self.game.map.rows)
+                while self.game.map.is_wall(x, y) or (pos in self.restricted_area):
+                    pos = x, y = rng.randrange(self.game.map.cols), rng.randrange(self.game.map.rows)
                 self.add_npc(npc(self.game, pos=(x + 0.5, y + 0.5)))
 
+    def spawn_nearby(self):
+        if not self.spawn_table:
+            return
+        chunk_x, chunk_y = self.game.map.get_chunk(*self.game.player.map_pos)
+        if (chunk_x, chunk_y) == self.player_chunk:
+            return
+        self.player_chunk = chunk_x, chunk_y
+        for j in range(chunk_y - SPAWN_RADIUS, chunk_y + SPAWN_RADIUS + 1):
+            for i in range(chunk_x - SPAWN_RADIUS, chunk_x + SPAWN_RADIUS + 1):
+                if (i, j) not in self.spawned_chunks:
+                    self.spawned_chunks.add((i, j))
+                    for x, y, kind in self.game.map.get_spawns(i, j):
+                        self.spawn(kind, (x, y))
+
+    def spawn(self, kind, pos):
+        if kind in self.spawn_types:
+            self.npcs_left -= 1
+            self.add_npc(self.spawn_types[kind](self.game, pos=pos))
+        else:
+            self.add_sprite(AnimatedSprite(self.game, path=self.anim_sprite_path + kind + '/0.png', pos=pos))
+
     def check_win(self):
-        if not len(self.npc_positions):
-            self.game.object_renderer.win()
-            pg.display.flip()
-            pg.time.delay(1500)
+        if not len(self.npc_grid) and not self.npcs_left:
+            self.game.object_render.win()
+            self.game.delay(1500)
             self.game.new_game()
 
-    def update(self):
-        self.npc_positions = {npc.map_pos for npc in self.npc_list if npc.alive}
-        [sprite.update() for sprite in self.sprite_list]
-        [npc.update() for npc in self.npc_list]
+    def save_state(self):
+        [npc.save_state() for npc in self.npc_list]
+
+    def interpolate(self, alpha):
+        [npc.interpolate(alpha) for npc in self.npc_list]
+
+    def step(self):
+        section = self.game.profiler.section
+        self.spawn_nearby()
+        with section('line_of_sight'):
+            # every living npc every tick: batched, line of sight is cheap, and an npc the player steps into
+            # view of is promoted by the scheduler on this very tick, whatever its tier
+            npcs = [npc for npc in self.npc_list if npc.alive]
+            self.line_of_sight.update(npcs)
+            for npc in npcs:
+                npc.ray_cast_value = self.line_of_sight.visible[npc]
+        npcs = self.game.scheduler.get_due(self.npc_list)
+        with section('npcs'):
+            [npc.find_player() for npc in npcs]
+            self.game.scheduler.run(npcs)
         self.check_win()
 
+    def update(self):
+        section = self.game.profiler.section
+        with section('sprites'):
+            [sprite.update() for sprite in self.sprite_list]
+        with section('npc_projection'):
+            [npc.update() for npc in self.npc_list]
+
     def add_npc(self, npc):
         self.npc_list.append(npc)
+        if npc.alive:
+            self.npc_grid.add(npc, npc.map_pos)
 
     def add_sprite(self, sprite):
         self.sprite_list.append(sprite)
\ No newline at end of file
@@ -1,5 +1,14 @@
 import pygame as pg
+import math
+from operator import itemgetter
 from settings import *
+from cache import SurfaceCache
+from assets import assets
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class ObjectRenderer:
@@ -7,8 +16,24 @@ class ObjectRenderer:
         self.game = game
         self.screen = game.screen
         self.wall_textures = self.load_wall_textures()
+        self.sprite_cache = SurfaceCache(SPRITE_CACHE_SIZE, SPRITE_CACHE_MEMORY) if SPRITE_CACHE else None
+        self.render_mode = RENDER_MODE if np is not None else 'blit'
+        if self.render_mode == 'framebuffer':
+            self.wall_pixels = self.get_wall_pixels()
+            self.screen_rows = np.arange(HEIGHT, dtype=np.float32)
+        self.floor_pixels = self.ceiling_pixels = None
+        if self.render_mode == 'framebuffer' and FLOOR_TEXTURE:
+            self.floor_pixels = self.get_floor_pixels(FLOOR_TEXTURE)
+        if self.render_mode == 'framebuffer' and CEILING_TEXTURE:
+            self.ceiling_pixels = self.get_floor_pixels(CEILING_TEXTURE)
+        # distance to the floor seen by each screen row below the horizon, the ceiling mirrors it
+        self.floor_dist = (game.camera.screen_dist / 2 / (np.arange(HEIGHT - HALF_HEIGHT) + 0.5)).astype(
+            np.float32) if self.floor_pixels is not None or self.ceiling_pixels is not None else None
         self.sky_image = self.get_texture('resources/textures/sky.png', (WIDTH, HALF_HEIGHT))
         self.sky_offset = 0
+        # sky widths scrolled per full turn: about 4.5 pixels per unit of mouse movement, rounded to a whole
+        # number so the sky lines up again when the view angle wraps around at tau
+        self.sky_repeats = max(1, round(4.5 * math.tau / (MOUSE_SENSITIVITY * SIM_DT) / WIDTH))
         self.blood_screen = self.get_texture('resources/textures/blood_screen.png', RES)
         self.digit_size = 90
         self.digit_images = [self.get_texture(f'resources/textures/digits/{i}.png', [self.digit_size] * 2)
@@ -18,15 +43,24 @@ class ObjectRenderer:
         self.win_image = self.get_texture('resources/textures/win.png', RES)
 
     def draw(self):
-        self.draw_background()
-        self.render_game_objects()
-        self.draw_player_health()
+        section = self.game.profiler.section
+        with section('background'):
+            self.draw_background()
+        if self.render_mode == 'framebuffer':
+            with section('walls'):
+                self.draw_walls()
+        with section('render_objects'):
+            self.render_game_objects()
+        with section('hud'):
+            self.draw_player_health()
 
     def win(self):
         self.screen.blit(self.win_image, (0, 0))
+        pg.display.flip()
 
     def game_over(self):
         self.screen.blit(self.game_over_image, (0, 0))
+        pg.display.flip()
 
     def draw_player_health(self):
         health = str(self.game.player.health)
@@ -38,21 +72,154 @@ class ObjectRenderer:
         self.screen.blit(self.blood_screen, (0, 0))
 
     def draw_background(self):
-        self.sky_offset = (self.sky_offset + 4.5 * self.game.player.rel) % WIDTH
-        self.screen.blit(self.sky_image, (-self.sky_offset, 0))
-        self.screen.blit(self.sky_image, (-self.sky_offset + WIDTH, 0))
-        # floor
-        pg.draw.rect(self.screen, FLOOR_COLOR, (0, HALF_HEIGHT, WIDTH, HEIGHT))
+        if self.ceiling_pixels is None:
+            # tied to the view angle so it follows interpolation
+            self.sky_offset = self.game.player.view_angle / math.tau * WIDTH * self.sky_repeats % WIDTH
+            self.screen.blit(self.sky_image, (-self.sky_offset, 0))
+            self.screen.blit(self.sky_image, (-self.sky_offset + WIDTH, 0))
+        if self.floor_dist is not None:
+            with self.game.profiler.section('floor'):
+                self.draw_floor()
+        if self.floor_pixels is None:
+            pg.draw.rect(self.screen, FLOOR_COLOR, (0, HALF_HEIGHT, WIDTH, HEIGHT))
+
+    def draw_floor(self):
+        camera = self.game.camera
+        player = self.game.player
+        raycasting = self.game.raycasting
+        # rows between the horizon and the lowest wall bottom are covered by walls in every column
+        first_row = 0
+        if raycasting.ray_casting_result:
+            first_row = int(min(HEIGHT - HALF_HEIGHT, raycasting.get_ray_casting_arrays()[1].min() // 2))
+        if first_row >= HEIGHT - HALF_HEIGHT:
+            return  # walls fill the screen, no floor or ceiling shows
+
+        # world step per unit of row distance along every ray, undoing the fishbowl correction
+        ray_angles = player.view_angle - camera.half_fov + 0.0001 + np.arange(camera.num_rays) * camera.delta_angle
+        fishbowl = np.cos(ray_angles - player.view_angle)
+        dir_x = (np.cos(ray_angles) / fishbowl).astype(np.float32)
+        dir_y = (np.sin(ray_angles) / fishbowl).astype(np.float32)
+        dist = self.floor_dist[first_row:, None]
+
+        pixels = pg.surfarray.pixels2d(self.screen).T
+        raycasting.map_chunks(lambda first_ray, last_ray: self.draw_floor_columns(
+            pixels, dist, first_row, dir_x[first_ray:last_ray], dir_y[first_ray:last_ray], first_ray, last_ray))
+        del pixels
+
+    def draw_floor_columns(self, pixels, dist, first_row, dir_x, dir_y, first_ray, last_ray):
+        # world position under every screen pixel of these rays, then its texel in a one tile texture
+        player = self.game.player
+        x = player.view_x + dist * dir_x
+        y = player.view_y + dist * dir_y
+        x -= np.floor(x)
+        y -= np.floor(y)
+        texels = (x * TEXTURE_SIZE).astype(np.int32) * TEXTURE_SIZE + (y * TEXTURE_SIZE).astype(np.int32)
+
+        scale = self.game.camera.scale
+        columns = slice(first_ray * scale, last_ray * scale)
+        targets = []
+        if self.floor_pixels is not None:
+            targets.append((self.floor_pixels, pixels[HALF_HEIGHT + first_row:, columns]))
+        if self.ceiling_pixels is not None:
+            # row HALF_HEIGHT - 1 - i sees the ceiling as far away as row HALF_HEIGHT + i sees the floor
+            targets.append((self.ceiling_pixels, pixels[HALF_HEIGHT - 1 - first_row::-1, columns]))
+        for texture, rows in targets:
+            colors = texture.take(texels[:len(rows)])
+            for i in range(scale):
+                rows[:, i::scale] = colors
+
+    def draw_walls(self):
+        raycasting = self.game.raycasting
+        if not raycasting.ray_casting_result:
+            return
+        arrays = raycasting.get_ray_casting_arrays()
+        # only the band of screen rows the tallest wall reaches needs sampling
+        band = int(min(HALF_HEIGHT, arrays[1].max() // 2 + 1))
+        screen_rows = self.screen_rows[HALF_HEIGHT - band:HALF_HEIGHT + band, None]
+
+        # pixels2d is indexed (x, y); its transpose walks each screen row with a short stride
+        pixels = pg.surfarray.pixels2d(self.screen).T[HALF_HEIGHT - band:HALF_HEIGHT + band]
+        # every chunk of rays writes its own columns, so the chunks can run side by side
+        raycasting.map_chunks(lambda first_ray, last_ray: self.draw_wall_columns(
+            pixels, screen_rows, arrays, first_ray, last_ray))
+        del pixels
+
+    def draw_wall_columns(self, pixels, screen_rows, arrays, first_ray, last_ray):
+        depth, proj_height, texture, offset = (values[first_ray:last_ray] for values in arrays)
+
+        # texture row sampled by every screen row of every ray, same mapping as scaling a column to proj_height
+        top = (HALF_HEIGHT - proj_height // 2).astype(np.float32)
+        rows = ((screen_rows - top) * (TEXTURE_SIZE / proj_height).astype(np.float32)).astype(np.int32)
+        visible = (rows >= 0) & (rows < TEXTURE_SIZE)
+        rows.clip(0, TEXTURE_SIZE - 1, out=rows)
+        scale = self.game.camera.scale
+        texels = (texture.astype(np.int32) * TEXTURE_SIZE + (offset * (TEXTURE_SIZE - scale)).astype(np.int32)) * TEXTURE_SIZE
+
+        pixels = pixels[:, first_ray * scale:last_ray * scale]
+        for i in range(scale):
+            colors = self.wall_pixels.take(rows + (texels + i * TEXTURE_SIZE))
+            np.copyto(pixels[:, i::scale], colors, where=visible)
+
+    def clip_sprite(self, image, pos, depth):
+        # blits for the runs of columns where the sprite is nearer than the wall
+        raycasting = self.game.raycasting
+        scale = self.game.camera.scale
+        x, y = int(pos[0]), pos[1]
+        width = image.get_width()
+        first_ray = max(0, x // scale)
+        last_ray = min(len(raycasting.depth_buffer), -(-(x + width) // scale))
+        if first_ray >= last_ray:
+            return []
+        if np is not None:
+            depths = raycasting.get_ray_casting_arrays()[0]
+            visible = np.concatenate(([False], depths[first_ray:last_ray] > depth, [False]))
+            edges = (np.flatnonzero(visible[1:] != visible[:-1]).reshape(-1, 2) + first_ray).tolist()
+        else:
+            edges, start = [], None
+            for ray in range(first_ray, last_ray):
+                if raycasting.depth_buffer[ray] > depth:
+                    start = ray if start is None else start
+                elif start is not None:
+                    edges.append((start, ray))
+                    start = None
+            if start is not None:
+                edges.append((start, last_ray))
+        blits = []
+        for start, end in edges:
+            left = max(start * scale, x)
+            right = min(end * scale, x + width)
+            blits.append((image, (left, y), (left - x, 0, right - left, image.get_height())))
+        return blits
 
     def render_game_objects(self):
-        list_objects = sorted(self.game.raycasting.objects_to_render, key=lambda t: t[0], reverse=True)
-        for depth, image, pos in list_objects:
-            self.screen.blit(image, pos)
+        raycasting = self.game.raycasting
+        # the wall layer goes down first in one batch (framebuffer mode has already written it)
+        if raycasting.wall_columns:
+            self.screen.blits(raycasting.wall_columns, doreturn=False)
+        # then only the sprites, far to near, each cut to the columns where no wall hides it
+        sprites = sorted(raycasting.objects_to_render, key=itemgetter(0), reverse=True)
+        if raycasting.depth_buffer:
+            blits = [piece for depth, image, pos in sprites for piece in self.clip_sprite(image, pos, depth)]
+        else:
+            blits = [(image, pos) for depth, image, pos in sprites]
+        self.screen.blits(blits, doreturn=False)
 
     @staticmethod
     def get_texture(path, res=(TEXTURE_SIZE, TEXTURE_SIZE)):
-        texture = pg.image.load(path).convert_alpha()
-        return pg.transform.scale(texture, res)
+        return assets.get_image(path, res)
+
+    def get_wall_pixels(self):
+        # wall textures as one flat array of pixels in the screen's format, indexed by (id, x, y)
+        pixels = np.zeros((max(self.wall_textures) + 1, TEXTURE_SIZE, TEXTURE_SIZE), dtype=np.uint32)
+        for texture_id, texture in self.wall_textures.items():
+            pixels[texture_id] = pg.surfarray.array2d(texture.convert(self.screen))
+        return pixels.ravel()
+
+    def get_floor_pixels(self, path):
+        # a floor or ceiling texture as flat pixels in the screen's format, indexed by (x, y)
+        texture = self.get_texture(path).copy()
+        texture.fill(FLOOR_SHADE, special_flags=pg.BLEND_RGB_MULT)
+        return pg.surfarray.array2d(texture.convert(self.screen)).ravel()
 
     def load_wall_textures(self):
         return {
@@ -1,66 +1,79 @@
 from collections import deque
-from functools import lru_cache
+from settings import *
 
 
 class PathFinding:
     def __init__(self, game):
         self.game = game # Reference to the main game object
-        self.map = game.map.mini_map # Reference our mini map for pathfinding
+        self.map = game.map # Reference our map for pathfinding
 
         # Directions left, up, right, down, diagonals
         self.ways = [-1, 0], [0, -1], [1, 0], [0, 1], [-1, -1], [1, -1], [1, 1], [-1, 1]
 
         self.graph = {} # Dicitionary to store the graph representation of the map
-        self.get_graph() # Create teh graph based on the mini map
+        self.loaded_chunks = set() # Chunks of the map whose nodes are in the graph, loaded as paths reach them
 
-    # Cached method to get the next step in the path from start to goal
-    @lru_cache
-    def get_path(self, start, goal):
-        # Run BFS to get the visited nodes from start to goal
-        self.visited = self.bfs(start, goal, self.graph)
-        path = [goal] # Start building the path from the goal
-        step = self.visited.get(goal, start) # Get the previous step from the goal
+        self.reset() # Start without a flow field
+
+    # Forget the current flow field, the graph only depends on the map and is kept
+    def reset(self):
+        self.flow_field = {} # Next step towards the goal for every node that can reach it
+        self.goal = None # Tile the flow field currently leads to
+        self.occupied = None # NPC occupancy index the flow field was built with
+        self.occupied_version = None # Version of the occupancy index when the flow field was built
 
-        # Traverse the visited nodes back to the start to build the full path
-        while step and step != start:
-            path.append(step) # Add the current step to the path
-            step = self.visited[step] # Move to the previous step in the path
-        return path[-1] # Return the next step in the path (not the full path, just the next move)
+    # Get the next step from start towards goal by reading the flow field rooted at goal
+    def get_path(self, start, goal):
+        occupied = self.game.object_handler.npc_grid # Tiles currently held by living NPCs
+        # Only rebuild the flow field when the goal moves to another tile or an NPC changes tile
+        if goal != self.goal or occupied is not self.occupied or occupied.version != self.occupied_version:
+            with self.game.profiler.section('pathfinding'): # Time the rebuilds on their own
+                self.update_flow_field(goal, occupied)
+        return self.flow_field.get(start, goal) # Head straight for the goal if it can't be reached
 
-    # Breadth-first search (BFS) Algorithm to explore nodes and find the shortest path
-    def bfs(self, start, goal, graph):
-        queue = deque([start]) # Initialize the BFS queue with the start node
-        visited = {start: None} # Dictionary to track visited nodes and their previous node
+    # Breadth-first search (BFS) outwards from the goal, recording the next step back towards it for each node
+    def update_flow_field(self, goal, occupied):
+        self.goal = goal # Remember which tile the field leads to
+        self.occupied = occupied # Remember the occupancy index the field was built with
+        self.occupied_version = occupied.version # Occupancy version the field was built with
+        self.flow_field = {goal: goal} # The goal's next step is the goal itself
+        queue = deque([goal]) # Initialize the BFS queue with the goal node
+        goal_x, goal_y = goal # The search stops PATH_RADIUS tiles away from the goal
 
-        # Continue the BFS as long as there are no nodes in the queue
+        # Continue the BFS as long as there are nodes in the queue
         while queue:
             cur_node = queue.popleft() # Get current node from the front of the queue
 
-            # Have we reached the goal
-            if cur_node == goal:
-                break # If we've reached the goal then stop the search
-
-            # Get all connected nodes (neigbours) of the current node
-            next_nodes = graph[cur_node]
-
             # Explore each neigbour of the current node
-            for next_node in next_nodes:
-                # Only visit the neigbouring node if it hasnt been visited and isnt blocked by an npc
-                if next_node not in visited and next_node not in self.game.object_handler.npc_positions:
-                    queue.append(next_node) # Add the neigbour to the queue for further exploration
-                    visited[next_node] = cur_node # Mark the current node as the previous node for the neighbour
-        return visited # Return the visited dictionary with the path information
+            for next_node in self.get_neighbours(cur_node):
+                if next_node not in self.flow_field: # Only visit the neigbouring node if it hasnt been visited
+                    if max(abs(next_node[0] - goal_x), abs(next_node[1] - goal_y)) > PATH_RADIUS:
+                        continue # Too far from the goal, NPCs out there head straight for it
+                    self.flow_field[next_node] = cur_node # Stepping to the current node leads towards the goal
+                    # An NPC standing on a node can use the field but blocks paths through it
+                    if next_node not in occupied:
+                        queue.append(next_node) # Add the neigbour to the queue for further exploration
 
     # Get all valid neighbouring nodes (next possible positions) for a given node (x, y)
     def get_next_nodes(self, x, y):
         # Check all possible moves (up, left, right, down, diagonals) and return valid neighbours
-        return [(x + dx, y + dy) for dx, dy in self.ways if (x + dx, y + dy) not in self.game.map.world_map]
+        return [(x + dx, y + dy) for dx, dy in self.ways if not self.game.map.is_wall(x + dx, y + dy)]
+
+    # Get the neighbours of a node, loading the node's chunk into the graph the first time it is reached
+    def get_neighbours(self, node):
+        chunk = self.map.get_chunk(*node) # Chunk the node belongs to
+        if chunk not in self.loaded_chunks:
+            self.load_chunk(chunk) # First visit to this part of the map
+        return self.graph.get(node, [])
 
-    # Create a graph from the mini-map where each free cell is to it's valid neighbours
-    def get_graph(self):
-        # loop through each cell in the mini map
-        for y, row in enumerate(self.map):
-            for x, col in enumerate(row):
-                if not col: # If the cell is walkable/false (not a wall)
-                    # Add the cell to the graph and connect it to it's neighbouring nodes 
-                    self.graph[(x, y)] = self.graph.get((x, y), []) + self.get_next_nodes(x, y)
\ No newline at end of file
+    # Add every free cell of a chunk to the graph, connected to it's valid neighbours
+    def load_chunk(self, chunk):
+        self.loaded_chunks.add(chunk) # Never load the same chunk twice
+        size = self.map.chunk_size # Tiles per side of a chunk
+        chunk_x, chunk_y = chunk
+        # loop through each cell in the chunk that lies on the map
+        for y in range(max(0, chunk_y * size), min(self.map.rows, (chunk_y + 1) * size)):
+            for x in range(max(0, chunk_x * size), min(self.map.cols, (chunk_x + 1) * size)):
+                if not self.map.is_wall(x, y): # If the cell is walkable (not a wall)
+                    # Add the cell to the graph and connect it to it's neighbouring nodes
+                    self.graph[(x, y)] = self.get_next_nodes(x, y)
\ No newline at end of file
@@ -6,13 +6,15 @@ import math
 class Player():
     def __init__(self, game):
         self.game = game  # Reference to the main game instance
-        self.x, self.y = PLAYER_POS  # Set player's initial position
+        self.x, self.y = game.map.player_pos  # Set player's initial position
         self.angle = PLAYER_ANGLE  # Set player's initial angle (direction)
         self.shot = False  # Track if player has fired a shot
         self.health = PLAYER_MAX_HEALTH  # Initialize player's health
         self.rel = 0  # Mouse movement delta (relative motion)
         self.health_recovery_delay = 700  # Delay in milliseconds before health recovery
-        self.time_prev = pg.time.get_ticks()  # Timestamp to track health recovery timing
+        self.time_prev = game.get_ticks()  # Timestamp to track health recovery timing
+        self.save_state()  # Position and angle at the previous simulation tick
+        self.interpolate(1)  # Position and angle the frame is rendered from
 
         self.diag_move_corr = 1 / math.sqrt(2)  # Correction factor for diagonal movement
 
@@ -24,7 +26,7 @@ class Player():
 
     # Check if time for health recovery has passed
     def check_health_recovery_delay(self) -> bool:
-        time_now = pg.time.get_ticks() # Get current time
+        time_now = self.game.get_ticks() # Get current time
         if time_now - self.time_prev > self.health_recovery_delay:
             self.time_prev = time_now # Update previous time
             return True # Return True if enough time has passed for recovery
@@ -32,16 +34,15 @@ class Player():
     # Check if player's health has dropped below 1 (game over)
     def check_game_over(self):
         if self.health < 1: # If player is the below
-            self.game.object_render.game_over() # render the game over screen
-            pg.display.flip() # Update display
-            pg.time.delay(1500) # Delay Before ...
+            self.game.object_render.game_over() # Show the game over screen
+            self.game.delay(1500) # Delay Before ...
             self.game.new_game() # Loading a new game
 
     # Handle damage delt to the player
     def get_damage(self, damage):
         self.health -= damage # Take away from health the amount of damage done
         self.game.object_render.player_damage() # inform player they've been hurt
-        self.game.sound.player_pain.play() # MP3 of the character in pain
+        self.game.sound.play(self.game.sound.player_pain) # MP3 of the character in pain, on its own channel
         self.check_game_over() # Check whether they're out of health
 
     # Handle mouse button events (Firing Weapon)
@@ -49,7 +50,7 @@ class Player():
         if event.type == pg.MOUSEBUTTONDOWN: # If left click
             #  Check the player is not in the process of shooting already or reloading their weapon
             if event.button == 1 and not self.shot and not self.game.weapon.reloading:
-                self.game.sound.shotgun.play() # Play shotgun Sound Effect
+                self.game.sound.play(self.game.sound.shotgun) # Play shotgun Sound Effect on its own channel
                 self.shot = True # Player has fired a shot
                 self.game.weapon.reloading = True # Cock/Reload the gun
 
@@ -58,11 +59,11 @@ class Player():
         sin_a = math.sin(self.angle) # Calculate the Sine of the player's angle
         cos_a = math.cos(self.angle) # Calculate the Cosine of the player's angle
         dx, dy = 0, 0 # Init movement in x and y directions
-        speed = PLAYER_SPEED * self.game.delta_time # Player's movement speed adjusted by delta time
+        speed = PLAYER_SPEED * SIM_DT # Player's movement speed over one simulation tick
         speed_sin = speed * sin_a # Movement speed on the Y Axis
         speed_cos = speed * cos_a # Movement speed on the X Axis
 
-        keys = pg.key.get_pressed() # Get currently pressed keys
+        keys = self.game.input.get_pressed() # Get currently pressed keys
         num_key_pressed = -1 # Track number of keys pressed for diagonal movement check
         if keys[pg.K_w]: # Move forward
             num_key_pressed += 1 
@@ -92,11 +93,11 @@ class Player():
 
     # Check if the player's future position would collid with a wall
     def check_wall(self, x, y):
-        return (x, y) not in self.game.map.world_map # Return true if position is not where a wall is
+        return not self.game.map.is_wall(x, y) # Return true if position is not where a wall is
     
     # Handle wall collisions with walls and adjust the player's position accordingly
     def check_wall_collision(self, dx, dy):
-        scale = PLAYER_SIZE_SCALE / self.game.delta_time # Scale movement based on the Player's Size and delta_time
+        scale = PLAYER_SIZE_SCALE / SIM_DT # Scale movement based on the Player's Size and the tick length
 
         # Dont let the player move in the coordinal direction if there is a wall there
         if self.check_wall(int(self.x + dx * scale), int(self.y)):
@@ -112,14 +113,25 @@ class Player():
         pg.draw.circle(self.game.screen, 'green', (self.x * 100, self.y * 100), 15)
 
     def mouse_control(self):
-        mx, my = pg.mouse.get_pos() # Get mouse position
+        mx, my = self.game.input.get_pos() # Get mouse position
         if mx < MOUSE_BORDER_LEFT or mx > MOUSE_BORDER_RIGHT:
-            pg.mouse.set_pos([HALF_WIDTH, HALF_HEIGHT]) # Reset mouse position to the center of the screen if it goes beyond the borders of the window/screen
-        self.rel = pg.mouse.get_rel()[0] # Get mouse movement relative
+            self.game.input.set_pos([HALF_WIDTH, HALF_HEIGHT]) # Reset mouse position to the center of the screen if it goes beyond the borders of the window/screen
+        self.rel = self.game.input.get_rel()[0] # Get mouse movement relative
         self.rel = max(-MOUSE_MAX_REL, min(MOUSE_MAX_REL, self.rel)) # Clamp mouse movement to avoid overly fast rotations
-        self.angle += self.rel * MOUSE_SENSITIVITY * self.game.delta_time # Update player's angle based on mouse movement
+        self.angle += self.rel * MOUSE_SENSITIVITY * SIM_DT # Update player's angle based on mouse movement
 
-    # Update player's state each frame
+    # Remember the position and angle before the next simulation tick changes them
+    def save_state(self):
+        self.prev_x, self.prev_y, self.prev_angle = self.x, self.y, self.angle
+
+    # Blend the rendered view between the previous and the current simulation tick
+    def interpolate(self, alpha):
+        self.view_x = self.prev_x + (self.x - self.prev_x) * alpha # Interpolated X Position
+        self.view_y = self.prev_y + (self.y - self.prev_y) * alpha # Interpolated Y Position
+        turn = (self.angle - self.prev_angle + math.pi) % math.tau - math.pi # Shortest turn between the ticks
+        self.view_angle = (self.prev_angle + turn * alpha) % math.tau # Interpolated angle
+
+    # Update player's state each simulation tick
     def update(self):
         self.movement() # Handle player movement
         self.mouse_control() # Handle mouse input for rotation
@@ -133,4 +145,14 @@ class Player():
    # Return the player's current position on the map as coordinates in a tuple 
     @property
     def map_pos(self) -> tuple:
-        return int(self.x), int(self.y)
\ No newline at end of file
+        return int(self.x), int(self.y)
+
+    # Return the interpolated position the frame is rendered from
+    @property
+    def view_pos(self) -> tuple:
+        return self.view_x, self.view_y
+
+    # Return the map tile holding the interpolated position
+    @property
+    def view_map_pos(self) -> tuple:
+        return int(self.view_x), int(self.view_y)
\ No newline at end of file
@@ -0,0 +1,89 @@
+import json
+import time
+from collections import deque
+import pygame as pg
+from settings import *
+
+
+class NullSection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class Section:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        self.profiler.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.depth -= 1
+        self.profiler.events.append((self.name, self.start, time.perf_counter_ns() - self.start,
+                                     self.profiler.depth))
+        return False
+
+
+class FrameProfiler:
+    def __init__(self, game, enabled=PROFILER_ENABLED):
+        self.game = game
+        self.enabled = enabled
+        self.show_overlay = enabled
+        self.frames = deque(maxlen=PROFILER_HISTORY)
+        self.events = []
+        self.depth = 0
+        self.frame_start = 0
+        self.null_section = NullSection()
+        self.font = None
+
+    def section(self, name):
+        return Section(self, name) if self.enabled else self.null_section
+
+    def begin_frame(self):
+        if self.enabled:
+            self.events = []
+            self.frame_start = time.perf_counter_ns()
+
+    def end_frame(self):
+        if self.enabled:
+            self.events.append(('frame', self.frame_start, time.perf_counter_ns() - self.frame_start, 0))
+            self.frames.append(self.events)
+
+    def get_averages(self):
+        # mean milliseconds per frame spent in each section over the frames in the ring buffer
+        totals, depths = {}, {}
+        for events in self.frames:
+            for name, start, duration, depth in events:
+                totals[name] = totals.get(name, 0) + duration
+                depths.setdefault(name, depth)
+        num_frames = max(1, len(self.frames))
+        return [(name, depths[name], total / num_frames / 1e6) for name, total in totals.items()]
+
+    def draw_overlay(self):
+        if not (self.enabled and self.show_overlay and self.frames):
+            return
+        if self.font is None:
+            self.font = pg.font.Font(None, 24)
+        # list stages in the order they started in the latest frame, nested under their parents
+        starts = {name: start for name, start, duration, depth in self.frames[-1]}
+        averages = sorted(self.get_averages(), key=lambda t: starts.get(t[0], 0))
+        for i, (name, depth, ms) in enumerate(averages):
+            text = self.font.render(f'{"  " * depth}{name}: {ms:.2f} ms', True, 'yellow', 'black')
+            self.game.screen.blit(text, (WIDTH - 320, 10 + i * 20))
+
+    def export_chrome_trace(self, path=PROFILER_TRACE_PATH):
+        # complete ('X') events in microseconds, viewable in chrome://tracing or Perfetto
+        trace_events = [
+            {'name': name, 'cat': 'frame' if name == 'frame' else 'stage', 'ph': 'X',
+             'ts': start / 1000, 'dur': duration / 1000, 'pid': 1, 'tid': 1}
+            for events in self.frames for name, start, duration, depth in events
+        ]
+        with open(path, 'w') as file:
+            json.dump({'traceEvents': trace_events, 'displayTimeUnit': 'ms'}, file)
+        return path
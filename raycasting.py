@@ -1,45 +1,111 @@
 import pygame as pg
 import math
+from concurrent.futures import ThreadPoolExecutor
 from settings import *
+from cache import SurfaceCache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 class RayCasting:
     def __init__(self, game):
         self.game = game
         self.ray_casting_result = []
+        self.ray_casting_arrays = None
+        self.depth_buffer = []
+        self.sprites_drawn, self.sprites_culled = 0, 0
         self.objects_to_render = []
+        self.wall_columns = []
         self.textures = self.game.object_render.wall_textures
+        self.wall_cache = SurfaceCache(WALL_STRIP_CACHE_SIZE, WALL_STRIP_CACHE_MEMORY) if WALL_STRIP_CACHE else None
+        self.backend = RAY_CASTING_BACKEND if np is not None else 'python'
+        if self.backend == 'numpy':
+            # zero-copy view of the map's tile grid
+            self.grid = np.frombuffer(self.game.map.grid, dtype=np.uint8).reshape(self.game.map.rows, -1)
+        self.executor = None
+        self.set_workers(RAY_CASTING_WORKERS if self.backend == 'numpy' else 1)
+
+    def set_workers(self, workers):
+        # numpy releases the GIL inside its kernels, so contiguous chunks of rays run on threads
+        if self.executor is not None:
+            self.executor.shutdown()
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+
+    def map_chunks(self, function):
+        # function(first_ray, last_ray) for every chunk of the camera's rays, results in ray order
+        num_rays = self.game.camera.num_rays
+        if self.executor is None:
+            return [function(0, num_rays)]
+        bounds = [num_rays * i // self.workers for i in range(self.workers + 1)]
+        return list(self.executor.map(function, bounds[:-1], bounds[1:]))
+
+    def get_cached_wall_column(self, ray, texture, offset, proj_height):
+        scale = self.game.camera.scale
+        column = int(offset * (TEXTURE_SIZE - scale))
+        if proj_height < HEIGHT:
+            height = max(1, round(proj_height / WALL_HEIGHT_STEP) * WALL_HEIGHT_STEP)
+            texture_rows = TEXTURE_SIZE
+        else:
+            # clipped columns are quantized by the number of texture rows they show
+            texture_rows = max(1, int(TEXTURE_SIZE * HEIGHT / proj_height))
+            height = HEIGHT * TEXTURE_SIZE // texture_rows
+
+        key = texture, column, height, scale
+        wall_column = self.wall_cache.get(key)
+        if wall_column is None:
+            wall_column = self.textures[texture].subsurface(
+                column, HALF_TEXTURE_SIZE - texture_rows // 2, scale, texture_rows
+            )
+            wall_column = self.wall_cache.put(key, pg.transform.scale(wall_column, (scale, min(height, HEIGHT))))
+        return wall_column, (ray * scale, max(0, HALF_HEIGHT - height // 2))
 
     def get_objects_to_render(self):
+        # wall columns form their own layer, objects_to_render only collects the sprites
         self.objects_to_render = []
+        self.wall_columns = []
+        if self.game.object_render.render_mode == 'framebuffer':
+            # walls are drawn straight into the screen by ObjectRenderer.draw_walls
+            return
+        scale = self.game.camera.scale
         for ray, values in enumerate(self.ray_casting_result):
             depth, proj_height, texture, offset = values
 
-            if proj_height < HEIGHT:
+            if self.wall_cache is not None:
+                wall_column, wall_pos = self.get_cached_wall_column(ray, texture, offset, proj_height)
+            elif proj_height < HEIGHT:
                 wall_column = self.textures[texture].subsurface(
-                    offset * (TEXTURE_SIZE - SCALE), 0, SCALE, TEXTURE_SIZE
+                    offset * (TEXTURE_SIZE - scale), 0, scale, TEXTURE_SIZE
                 )
-                wall_column = pg.transform.scale(wall_column, (SCALE, proj_height))
-                wall_pos = (ray * SCALE, HALF_HEIGHT - proj_height // 2)
+                wall_column = pg.transform.scale(wall_column, (scale, proj_height))
+                wall_pos = (ray * scale, HALF_HEIGHT - proj_height // 2)
             else:
                 texture_height = TEXTURE_SIZE * HEIGHT / proj_height
                 wall_column = self.textures[texture].subsurface(
-                    offset * (TEXTURE_SIZE - SCALE), HALF_TEXTURE_SIZE - texture_height // 2,
-                    SCALE, texture_height
+                    offset * (TEXTURE_SIZE - scale), HALF_TEXTURE_SIZE - texture_height // 2,
+                    scale, texture_height
                 )
-                wall_column = pg.transform.scale(wall_column, (SCALE, HEIGHT))
-                wall_pos = (ray * SCALE, 0)
+                wall_column = pg.transform.scale(wall_column, (scale, HEIGHT))
+                wall_pos = (ray * scale, 0)
 
-            self.objects_to_render.append((depth, wall_column, wall_pos))
+            self.wall_columns.append((wall_column, wall_pos))
 
-    def ray_cast(self):
+    def ray_cast_python(self):
         self.ray_casting_result = []
+        self.ray_casting_arrays = None
+        self.depth_buffer = []
         texture_vert, texture_hor = 1, 1
-        ox, oy = self.game.player.pos
-        x_map, y_map = self.game.player.map_pos
+        ox, oy = self.game.player.view_pos
+        x_map, y_map = self.game.player.view_map_pos
+        angle = self.game.player.view_angle
+        camera = self.game.camera
+        get_tile = self.game.map.get_tile
 
-        ray_angle = self.game.player.angle - HALF_FOV + 0.0001
-        for ray in range(NUM_RAYS):
+        ray_angle = angle - camera.half_fov + 0.0001
+        for ray in range(camera.num_rays):
             sin_a = math.sin(ray_angle)
             cos_a = math.cos(ray_angle)
 
@@ -53,9 +119,9 @@ class RayCasting:
             dx = delta_depth * cos_a
 
             for i in range(MAX_DEPTH):
-                tile_hor = int(x_hor), int(y_hor)
-                if tile_hor in self.game.map.world_map:
-                    texture_hor = self.game.map.world_map[tile_hor]
+                tile = get_tile(int(x_hor), int(y_hor))
+                if tile:
+                    texture_hor = tile
                     break
                 x_hor += dx
                 y_hor += dy
@@ -71,9 +137,9 @@ class RayCasting:
             dy = delta_depth * sin_a
 
             for i in range(MAX_DEPTH):
-                tile_vert = int(x_vert), int(y_vert)
-                if tile_vert in self.game.map.world_map:
-                    texture_vert = self.game.map.world_map[tile_vert]
+                tile = get_tile(int(x_vert), int(y_vert))
+                if tile:
+                    texture_vert = tile
                     break
                 x_vert += dx
                 y_vert += dy
@@ -90,16 +156,138 @@ class RayCasting:
                 offset = (1 - x_hor) if sin_a > 0 else x_hor
 
             # remove fishbowl effect
-            depth *= math.cos(self.game.player.angle - ray_angle)
+            depth *= math.cos(angle - ray_angle)
 
             # projection
-            proj_height = SCREEN_DIST / (depth + 0.0001)
+            proj_height = camera.screen_dist / (depth + 0.0001)
 
             # ray casting result
             self.ray_casting_result.append((depth, proj_height, texture, offset))
+            self.depth_buffer.append(depth)
+
+            ray_angle += camera.delta_angle
+
+    @staticmethod
+    def walk(start, step):
+        # positions along MAX_DEPTH grid lines for every ray; cumsum adds the steps
+        # in the same order as the reference loop, so both backends agree bit for bit
+        steps = np.empty((len(start), MAX_DEPTH + 1))
+        steps[:, 0] = start
+        steps[:, 1:] = step[:, None]
+        return np.cumsum(steps, axis=1)
+
+    def hit_walls(self, xs, ys):
+        rows, cols = self.grid.shape
+        tile_x = xs[:, :MAX_DEPTH].astype(np.int64)
+        tile_y = ys[:, :MAX_DEPTH].astype(np.int64)
+        inside = (tile_x >= 0) & (tile_x < cols) & (tile_y >= 0) & (tile_y < rows)
+        tiles = np.where(inside, self.grid[tile_y.clip(0, rows - 1), tile_x.clip(0, cols - 1)], 0)
+
+        hit = tiles > 0
+        found = hit.any(axis=1)
+        step = np.where(found, hit.argmax(axis=1), MAX_DEPTH)
+        texture = tiles[np.arange(len(xs)), step.clip(0, MAX_DEPTH - 1)]
+        return step, texture, found
+
+    @staticmethod
+    def carry_textures(texture, found):
+        # a ray that hits nothing keeps the texture of the last ray that did
+        last = np.maximum.accumulate(np.where(found, np.arange(len(texture)), -1))
+        return np.where(last >= 0, texture[last.clip(0)], 1)
+
+    def cast_chunk(self, sin_a, cos_a, first_ray, last_ray):
+        ox, oy = self.game.player.view_pos
+        x_map, y_map = self.game.player.view_map_pos
+        sin_a, cos_a = sin_a[first_ray:last_ray], cos_a[first_ray:last_ray]
+        rays = np.arange(last_ray - first_ray)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # horizontals
+            y_hor = np.where(sin_a > 0, y_map + 1, y_map - 1e-6)
+            dy = np.where(sin_a > 0, 1.0, -1.0)
+            depth_hor = (y_hor - oy) / sin_a
+            x_hor = ox + depth_hor * cos_a
+            delta_depth = dy / sin_a
+            dx = delta_depth * cos_a
+
+            xs, ys, depths = self.walk(x_hor, dx), self.walk(y_hor, dy), self.walk(depth_hor, delta_depth)
+            step, texture_hor, found_hor = self.hit_walls(xs, ys)
+            x_hor, depth_hor = xs[rays, step], depths[rays, step]
 
-            ray_angle += DELTA_ANGLE
+            # verticals
+            x_vert = np.where(cos_a > 0, x_map + 1, x_map - 1e-6)
+            dx = np.where(cos_a > 0, 1.0, -1.0)
+            depth_vert = (x_vert - ox) / cos_a
+            y_vert = oy + depth_vert * sin_a
+            delta_depth = dx / cos_a
+            dy = delta_depth * sin_a
+
+            xs, ys, depths = self.walk(x_vert, dx), self.walk(y_vert, dy), self.walk(depth_vert, delta_depth)
+            step, texture_vert, found_vert = self.hit_walls(xs, ys)
+            y_vert, depth_vert = ys[rays, step], depths[rays, step]
+
+        return x_hor, depth_hor, texture_hor, found_hor, y_vert, depth_vert, texture_vert, found_vert
+
+    def ray_cast_numpy(self):
+        angle = self.game.player.view_angle
+        camera = self.game.camera
+
+        ray_angles = np.full(camera.num_rays, camera.delta_angle)
+        ray_angles[0] = angle - camera.half_fov + 0.0001
+        ray_angles = np.cumsum(ray_angles)
+        sin_a = np.sin(ray_angles)
+        cos_a = np.cos(ray_angles)
+
+        # the grid walks run per chunk, the texture carry-over has to see every ray in order
+        chunks = self.map_chunks(lambda first_ray, last_ray: self.cast_chunk(sin_a, cos_a, first_ray, last_ray))
+        (x_hor, depth_hor, texture_hor, found_hor,
+         y_vert, depth_vert, texture_vert, found_vert) = (np.concatenate(values) for values in zip(*chunks))
+        texture_hor = self.carry_textures(texture_hor, found_hor)
+        texture_vert = self.carry_textures(texture_vert, found_vert)
+
+        # depth, texture offset
+        vert = depth_vert < depth_hor
+        depth = np.where(vert, depth_vert, depth_hor)
+        texture = np.where(vert, texture_vert, texture_hor)
+        y_vert %= 1
+        x_hor %= 1
+        offset = np.where(vert, np.where(cos_a > 0, y_vert, 1 - y_vert),
+                          np.where(sin_a > 0, 1 - x_hor, x_hor))
+
+        # remove fishbowl effect
+        depth *= np.cos(angle - ray_angles)
+
+        # projection
+        proj_height = camera.screen_dist / (depth + 0.0001)
+
+        self.ray_casting_arrays = depth, proj_height, texture, offset
+        self.depth_buffer = depth.tolist()
+        self.ray_casting_result = list(zip(self.depth_buffer, proj_height.tolist(),
+                                           texture.tolist(), offset.tolist()))
+
+    def get_ray_casting_arrays(self):
+        if self.ray_casting_arrays is None:
+            self.ray_casting_arrays = tuple(np.array(values) for values in zip(*self.ray_casting_result))
+        return self.ray_casting_arrays
+
+    def is_occluded(self, left, right, depth):
+        # True when every ray between screen x left and right hits a wall nearer than depth
+        camera = self.game.camera
+        first_ray = max(0, int(left // camera.scale))
+        last_ray = min(camera.num_rays, int(right // camera.scale) + 1)
+        if first_ray >= last_ray or not self.depth_buffer:
+            return False
+        return max(self.depth_buffer[first_ray:last_ray]) < depth
+
+    def ray_cast(self):
+        if self.backend == 'numpy':
+            self.ray_cast_numpy()
+        else:
+            self.ray_cast_python()
 
     def update(self):
-        self.ray_cast()
-        self.get_objects_to_render()
\ No newline at end of file
+        self.sprites_drawn, self.sprites_culled = 0, 0
+        with self.game.profiler.section('ray_cast'):
+            self.ray_cast()
+        with self.game.profiler.section('wall_columns'):
+            self.get_objects_to_render()
\ No newline at end of file
@@ -7,6 +7,23 @@ HALF_WIDTH = WIDTH // 2  # Half of the screen width, used in various calculation
 HALF_HEIGHT = HEIGHT // 2  # Half of the screen height, used in various calculations
 FPS = 0  # Frames per second setting (0 might mean uncapped or unlimited FPS)
 
+# Simulation settings
+SIM_RATE = 60  # Simulation ticks per second, independent of how fast frames are rendered
+SIM_DT = 1000 / SIM_RATE  # Milliseconds of game time advanced by every simulation tick
+MAX_SIM_STEPS = 5  # Most simulation ticks run before a frame is drawn, so a slow frame can't snowball
+GLOBAL_TRIGGER_TIME = 40  # Milliseconds of game time between global triggers (e.g. death animation frames)
+
+# Benchmark settings
+BENCH_FRAMES = 1000  # Number of frames a headless benchmark runs for
+BENCH_SEED = 0  # Random seed used by the benchmark so every run plays out the same way
+BENCH_FRAME_TIME = SIM_DT  # Simulated milliseconds per benchmark frame, one simulation tick so no replayed input is skipped
+SOAK_NPCS = 1000  # NPCs spawned by the headless AI soak
+
+# Profiler settings
+PROFILER_ENABLED = False  # Time every frame stage (toggle the overlay with F3, export a trace with F4)
+PROFILER_HISTORY = 120  # Number of recent frames kept by the profiler
+PROFILER_TRACE_PATH = 'trace.json'  # Where the Chrome trace-event file is written
+
 # Player settings
 PLAYER_POS = 1.5, 5  # Initial player position on the mini-map (x, y)
 PLAYER_ANGLE = 0  # Initial angle or direction the player is facing (in radians)
@@ -23,6 +40,9 @@ MOUSE_BORDER_RIGHT = WIDTH - MOUSE_BORDER_LEFT  # Right border limit for mouse m
 
 # Floor settings
 FLOOR_COLOR = (30, 30, 30)  # RGB color for the floor in the game (a dark gray color)
+FLOOR_TEXTURE = 'resources/textures/1.png'  # Texture cast across the floor in framebuffer mode (None draws flat FLOOR_COLOR)
+CEILING_TEXTURE = None  # Texture cast across the ceiling in framebuffer mode (None keeps the sky)
+FLOOR_SHADE = (120, 120, 120)  # Color the floor and ceiling textures are multiplied by, so walls stand out
 
 # Raycasting settings
 FOV = math.pi / 3  # Field of view (FOV) of the player, set to 60 degrees (pi/3 radians)
@@ -31,11 +51,73 @@ NUM_RAYS = WIDTH // 2  # Number of rays cast for rendering (half the screen widt
 HALF_NUM_RAYS = NUM_RAYS // 2  # Half of the number of rays, used for centering
 DELTA_ANGLE = FOV / NUM_RAYS  # The angle difference between each ray
 MAX_DEPTH = 20  # Maximum depth (distance) the ray will travel in the 3D world
+RAY_CASTING_BACKEND = 'numpy'  # 'numpy' casts all rays as one batch, 'python' is the reference per-ray loop
+RAY_CASTING_WORKERS = 4  # Threads the numpy backend splits ray casting and wall texturing across (1 stays on the main thread)
 
 # Screen distance settings
 SCREEN_DIST = HALF_WIDTH / math.tan(HALF_FOV)  # Distance from the player to the projection plane (used for 3D rendering)
 SCALE = WIDTH // NUM_RAYS  # Scaling factor for the width of each ray on the screen
 
+# Render scale governor settings (the camera starts at SCALE and NUM_RAYS above)
+RENDER_SCALE_ADAPTIVE = True  # Change the ray count between frames to hold FRAME_TIME_TARGET
+FRAME_TIME_TARGET = 1000 / 60  # Milliseconds of work per frame the governor aims for
+RENDER_SCALE_MIN = 1  # Narrowest ray column in pixels (most rays, sharpest walls)
+RENDER_SCALE_MAX = 8  # Widest ray column in pixels (fewest rays, fastest frames)
+RENDER_SCALE_SMOOTHING = 0.1  # Weight of the newest frame in the smoothed frame time
+RENDER_SCALE_COOLDOWN = 30  # Frames to wait after a change before the governor changes the scale again
+
+# Render settings
+RENDER_MODE = 'framebuffer'  # 'framebuffer' samples all wall columns into the screen's pixel array, 'blit' blits one surface per column
+
+# Wall strip cache settings
+WALL_STRIP_CACHE = True  # Reuse scaled wall columns between frames instead of rescaling every column
+WALL_STRIP_CACHE_SIZE = 20000  # Maximum number of cached wall strips
+WALL_STRIP_CACHE_MEMORY = 64 * 1024 * 1024  # Maximum memory (in bytes) held by cached wall strips
+WALL_HEIGHT_STEP = 2  # Projected wall heights are rounded to a multiple of this many pixels
+
+# Sprite cache settings
+SPRITE_CACHE = True  # Reuse projected sprite images between frames instead of rescaling every visible sprite
+SPRITE_CACHE_SIZE = 4000  # Maximum number of cached sprite images
+SPRITE_CACHE_MEMORY = 128 * 1024 * 1024  # Maximum memory (in bytes) held by cached sprite images
+SPRITE_HEIGHT_STEP = 4  # Projected sprite heights are rounded to a multiple of this many pixels
+
+# Asset pack settings
+ASSET_PACK = True  # Load decoded, pre-scaled images from a baked pack file, rebaking it when sources change
+ASSET_PACK_PATH = 'resources/assets.pack'  # Where the baked asset pack is stored
+ASSET_SOURCES = 'resources/textures', 'resources/sprites'  # Folders whose images are baked into the pack
+ASSET_LOAD_WORKERS = 4  # Threads decoding images and sounds at startup when there is no pack (0 decodes lazily)
+
+# Map settings
+MAP_PATH = None  # Map file to play (None plays the built-in map); make one with main.py --make-map
+MAP_CHUNK_SIZE = 16  # Tiles per side of the chunks a map file's spawns and pathfinding graph are loaded in
+MAP_SIZE = 256  # Tiles per side of maps generated by main.py --make-map
+SPAWN_RADIUS = 2  # Chunks around the player whose spawns are brought to life
+PATH_RADIUS = 32  # Tiles around the player the NPC flow field reaches
+
+# NPC AI level of detail settings
+AI_LOD = True  # Let idle NPCs away from the player think less often (False updates every NPC every tick)
+AI_NEAR_DIST = 8  # NPCs closer than this many tiles always think every tick
+AI_FAR_DIST = 20  # Idle NPCs beyond this many tiles think least often
+AI_MID_INTERVAL = 4  # Ticks between updates of idle NPCs between AI_NEAR_DIST and AI_FAR_DIST
+AI_FAR_INTERVAL = 16  # Ticks between updates of idle NPCs beyond AI_FAR_DIST
+AI_TICK_BUDGET = 2  # Milliseconds per tick the reduced-rate NPCs may use, the rest wait for the next tick
+
+# Sound settings
+SOUND_CHANNELS = 16  # Mixer channels shared by all sound effects
+SOUND_MAX_INSTANCES = 3  # Most copies of one NPC sound that may play at once
+SOUND_COOLDOWN = 50  # Milliseconds of game time within which repeated requests for one NPC sound are merged
+SOUND_MAX_DIST = 20  # NPC sounds further than this many tiles away are dropped, nearer ones fade with distance
+
+# Environment settings (the gym-style API in env.py)
+ENV_SCALE = 16  # Screen columns per depth observation ray, so each observation holds WIDTH // ENV_SCALE depths
+ENV_NPCS = None  # NPCs spawned per environment, None spawns what the map would
+ENV_MAX_NPCS = 32  # Nearest NPCs whose state is part of each observation
+ENV_MAX_STEPS = 7200  # Ticks before an episode is cut short (two minutes of game time)
+ENV_KILL_REWARD = 1  # Reward for every NPC killed
+ENV_DAMAGE_PENALTY = 0.01  # Penalty per point of health lost
+ENV_WIN_REWARD = 10  # Reward for clearing the map
+ENV_DEATH_PENALTY = 10  # Penalty for dying
+
 # Texture settings
 TEXTURE_SIZE = 256  # Size of each texture (width and height), typically a square
 HALF_TEXTURE_SIZE = TEXTURE_SIZE // 2  # Half of the texture size, often used in rendering calculations
@@ -0,0 +1,89 @@
+import random
+from settings import *
+from main import Game
+from map import Map
+from player import Player
+from camera import Camera
+from sprite_object import AnimatedSprite
+from object_handler import ObjectHandler
+from weapon import Weapon
+from pathfinding import PathFinding
+from ai_scheduler import AIScheduler
+from profiler import FrameProfiler
+
+
+class HeadlessRenderer:
+    # the screen effects gameplay asks for, with nothing to show them on
+    sprite_cache = None
+    wall_textures = None
+
+    def win(self):
+        pass
+
+    def game_over(self):
+        pass
+
+    def player_damage(self):
+        pass
+
+
+class HeadlessSound:
+    # counts what would have played instead of playing it
+    shotgun = npc_pain = npc_death = npc_shot = player_pain = None
+
+    def __init__(self):
+        self.played = 0
+
+    def play(self, sound):
+        self.played += 1
+
+    def play_at(self, sound, pos):
+        self.played += 1
+
+
+class HeadlessWeapon(Weapon):
+    # the same reload cycle over image stubs, the frames are never scaled or drawn
+    def __init__(self, game, path='resources/sprites/weapon/shotgun/0.png', animation_time=90):
+        AnimatedSprite.__init__(self, game, path=path, animation_time=animation_time)
+        self.num_images = len(self.images)
+        self.damage = 100
+        self.reset()
+
+
+class SoakGame(Game):
+    # the simulation alone: no window, no sound and no decoded assets, Game.step runs unchanged
+    headless = True  # sprites get ImageStubs from the asset registry
+
+    def __init__(self, controls, num_npcs=SOAK_NPCS, map_path=MAP_PATH, profile=True, seed=None):
+        self.input = controls
+        self.rng = random.Random(seed)
+        self.profiler = FrameProfiler(self, profile)
+        self.profiler.show_overlay = False
+        self.sim_time = 0
+        self.global_trigger = False
+        self.num_npcs = num_npcs
+        self.games = 0
+        self.map = Map(self, map_path)
+        self.camera = Camera(self)
+        self.object_render = HeadlessRenderer()
+        self.sound = HeadlessSound()
+        self.weapon = HeadlessWeapon(self)
+        self.pathfinding = PathFinding(self)
+        self.scheduler = AIScheduler(self)
+        self.new_game()
+
+    def new_game(self):
+        self.games += 1
+        self.player = Player(self)
+        self.object_handler = ObjectHandler(self, self.num_npcs)
+        self.weapon.reset()
+        self.pathfinding.reset()
+        self.scheduler.reset()
+
+    def delay(self, ms):
+        pass
+
+    def run_tick(self):
+        self.check_events()
+        self.step()
+        self.profiler.end_frame()
@@ -1,4 +1,7 @@
+import math
 import pygame as pg
+from settings import *
+from assets import assets
 
 
 class Sound:
@@ -6,11 +9,52 @@ class Sound:
         self.game = game
         pg.mixer.init()
         self.path = 'resources/sound/'
-        self.shotgun = pg.mixer.Sound(self.path + 'shotgun.wav')
-        self.npc_pain = pg.mixer.Sound(self.path + 'npc_pain.wav')
-        self.npc_death = pg.mixer.Sound(self.path + 'npc_death.wav')
-        self.npc_shot = pg.mixer.Sound(self.path + 'npc_attack.wav')
+        self.shotgun = assets.get_sound(self.path + 'shotgun.wav')
+        self.npc_pain = assets.get_sound(self.path + 'npc_pain.wav')
+        self.npc_death = assets.get_sound(self.path + 'npc_death.wav')
+        self.npc_shot = assets.get_sound(self.path + 'npc_attack.wav')
         self.npc_shot.set_volume(0.2)
-        self.player_pain = pg.mixer.Sound(self.path + 'player_pain.wav')
+        self.player_pain = assets.get_sound(self.path + 'player_pain.wav')
         self.theme = pg.mixer.music.load(self.path + 'theme.mp3')
-        pg.mixer.music.set_volume(0.3)
\ No newline at end of file
+        pg.mixer.music.set_volume(0.3)
+
+        # player sounds own reserved channels, find_channel never hands those to npc sounds
+        player_sounds = self.shotgun, self.player_pain
+        pg.mixer.set_num_channels(SOUND_CHANNELS + len(player_sounds))
+        pg.mixer.set_reserved(len(player_sounds))
+        self.player_channels = {sound: pg.mixer.Channel(i) for i, sound in enumerate(player_sounds)}
+        self.instances = {}  # sound -> channels last given to it
+        self.last_played = {}  # sound -> (game time, channel) of the latest instance
+        self.played, self.merged, self.dropped = 0, 0, 0
+
+    def play(self, sound):
+        self.player_channels[sound].play(sound)
+        self.played += 1
+
+    def play_at(self, sound, pos):
+        # an npc sound from pos: faded by distance, merged with a copy started moments ago,
+        # dropped when too far away, when SOUND_MAX_INSTANCES copies play or no channel is free
+        dist = math.dist(pos, self.game.player.pos)
+        if dist >= SOUND_MAX_DIST:
+            self.dropped += 1
+            return
+        volume = 1 - dist / SOUND_MAX_DIST
+        now = self.game.get_ticks()
+        time_prev, channel = self.last_played.get(sound, (-SOUND_COOLDOWN, None))
+        if now - time_prev < SOUND_COOLDOWN and channel.get_sound() is sound:
+            # the merged copy plays as loud as the nearest of the sources it stands for
+            channel.set_volume(max(channel.get_volume(), volume))
+            self.merged += 1
+            return
+
+        channels = [channel for channel in self.instances.get(sound, ())
+                    if channel.get_busy() and channel.get_sound() is sound]
+        channel = pg.mixer.find_channel() if len(channels) < SOUND_MAX_INSTANCES else None
+        if channel is None:
+            self.dropped += 1
+            return
+        channel.play(sound)
+        channel.set_volume(volume)
+        self.instances[sound] = channels + [channel]
+        self.last_played[sound] = now, channel
+        self.played += 1
@@ -0,0 +1,56 @@
+import math
+
+
+class SpatialGrid:
+    # tile -> occupants index, touched only when an occupant enters, leaves or changes tile
+    def __init__(self):
+        self.cells = {}
+        self.tiles = {}
+        self.version = 0
+
+    def __contains__(self, tile):
+        return tile in self.cells
+
+    def __len__(self):
+        return len(self.tiles)
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def add(self, obj, tile):
+        if obj in self.tiles:
+            self.move(obj, tile)
+            return
+        self.tiles[obj] = tile
+        self.cells.setdefault(tile, set()).add(obj)
+        self.version += 1
+
+    def remove(self, obj):
+        tile = self.tiles.pop(obj, None)
+        if tile is None:
+            return
+        cell = self.cells[tile]
+        cell.discard(obj)
+        if not cell:
+            del self.cells[tile]
+        self.version += 1
+
+    def move(self, obj, tile):
+        # objects that were never added (or already removed) are left out
+        if obj in self.tiles and self.tiles[obj] != tile:
+            self.remove(obj)
+            self.add(obj, tile)
+
+    def get_occupants(self, tile):
+        return self.cells.get(tile, set())
+
+    def get_within(self, pos, radius):
+        # occupants whose position is within radius of pos, scanning only the tiles that can hold them
+        x, y = pos
+        found = []
+        for i in range(math.floor(x - radius), math.floor(x + radius) + 1):
+            for j in range(math.floor(y - radius), math.floor(y + radius) + 1):
+                for obj in self.cells.get((i, j), ()):
+                    if math.hypot(obj.x - x, obj.y - y) <= radius:
+                        found.append(obj)
+        return found
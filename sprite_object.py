@@ -1,16 +1,15 @@
 import pygame as pg
 from settings import *
-import os
-from collections import deque
+from assets import assets
 
 
 class SpriteObject:
     def __init__(self, game, path='resources/sprites/static_sprites/candlebra.png',
                  pos=(10.5, 3.5), scale=0.7, shift=0.27):
         self.game = game
-        self.player = game.player
         self.x, self.y = pos
-        self.image = pg.image.load(path).convert_alpha()
+        self.prev_x, self.prev_y = self.view_x, self.view_y = pos
+        self.image = assets.get_image(path, headless=game.headless)
         self.IMAGE_WIDTH = self.image.get_width()
         self.IMAGE_HALF_WIDTH = self.image.get_width() // 2
         self.IMAGE_RATIO = self.IMAGE_WIDTH / self.image.get_height()
@@ -19,11 +18,27 @@ class SpriteObject:
         self.SPRITE_SCALE = scale
         self.SPRITE_HEIGHT_SHIFT = shift
 
+    @property
+    def player(self):
+        return self.game.player
+
+    def get_scaled_image(self, proj_width, proj_height):
+        cache = self.game.object_render.sprite_cache
+        if cache is None:
+            return pg.transform.scale(self.image, (proj_width, proj_height))
+        key = self.image, int(proj_height)
+        image = cache.get(key)
+        if image is None:
+            image = cache.put(key, pg.transform.scale(self.image, (proj_width, proj_height)))
+        return image
+
     def get_sprite_projection(self):
-        proj = SCREEN_DIST / self.norm_dist * self.SPRITE_SCALE
+        proj = self.game.camera.screen_dist / self.norm_dist * self.SPRITE_SCALE
+        if self.game.object_render.sprite_cache is not None:
+            proj = max(SPRITE_HEIGHT_STEP, round(proj / SPRITE_HEIGHT_STEP) * SPRITE_HEIGHT_STEP)
         proj_width, proj_height = proj * self.IMAGE_RATIO, proj
 
-        image = pg.transform.scale(self.image, (proj_width, proj_height))
+        image = self.get_scaled_image(proj_width, proj_height)
 
         self.sprite_half_width = proj_width // 2
         height_shift = proj_height * self.SPRITE_HEIGHT_SHIFT
@@ -31,22 +46,44 @@ class SpriteObject:
 
         self.game.raycasting.objects_to_render.append((self.norm_dist, image, pos))
 
-    def get_sprite(self):
-        dx = self.x - self.player.x
-        dy = self.y - self.player.y
+    def save_state(self):
+        self.prev_x, self.prev_y = self.x, self.y
+
+    def interpolate(self, alpha):
+        self.view_x = self.prev_x + (self.x - self.prev_x) * alpha
+        self.view_y = self.prev_y + (self.y - self.prev_y) * alpha
+
+    def locate(self, x, y, player_x, player_y, player_angle):
+        dx = x - player_x
+        dy = y - player_y
         self.dx, self.dy = dx, dy
         self.theta = math.atan2(dy, dx)
 
-        delta = self.theta - self.player.angle
-        if (dx > 0 and self.player.angle > math.pi) or (dx < 0 and dy < 0):
+        delta = self.theta - player_angle
+        if (dx > 0 and player_angle > math.pi) or (dx < 0 and dy < 0):
             delta += math.tau
 
-        delta_rays = delta / DELTA_ANGLE
-        self.screen_x = (HALF_NUM_RAYS + delta_rays) * SCALE
+        camera = self.game.camera
+        delta_rays = delta / camera.delta_angle
+        self.screen_x = (camera.half_num_rays + delta_rays) * camera.scale
 
         self.dist = math.hypot(dx, dy)
         self.norm_dist = self.dist * math.cos(delta)
+        if self.norm_dist > 0.5:
+            self.sprite_half_width = camera.screen_dist / self.norm_dist * self.SPRITE_SCALE * self.IMAGE_RATIO // 2
+
+    def get_sprite(self):
+        # project from the interpolated view, the simulation may be between ticks
+        player = self.player
+        self.locate(self.view_x, self.view_y, player.view_x, player.view_y, player.view_angle)
         if -self.IMAGE_HALF_WIDTH < self.screen_x < (WIDTH + self.IMAGE_HALF_WIDTH) and self.norm_dist > 0.5:
+            # skip sprites hidden behind walls across every column they cover
+            raycasting = self.game.raycasting
+            if raycasting.is_occluded(self.screen_x - self.sprite_half_width,
+                                      self.screen_x + self.sprite_half_width, self.norm_dist):
+                raycasting.sprites_culled += 1
+                return
+            raycasting.sprites_drawn += 1
             self.get_sprite_projection()
 
     def update(self):
@@ -60,7 +97,8 @@ class AnimatedSprite(SpriteObject):
         self.animation_time = animation_time
         self.path = path.rsplit('/', 1)[0]
         self.images = self.get_images(self.path)
-        self.animation_time_prev = pg.time.get_ticks()
+        self.frame_indices = {}
+        self.animation_time_prev = game.get_ticks()
         self.animation_trigger = False
 
     def update(self):
@@ -69,21 +107,18 @@ class AnimatedSprite(SpriteObject):
         self.animate(self.images)
 
     def animate(self, images):
+        # the frames are shared between instances, each instance only keeps its position in them
         if self.animation_trigger:
-            images.rotate(-1)
-            self.image = images[0]
+            index = (self.frame_indices.get(id(images), 0) + 1) % len(images)
+            self.frame_indices[id(images)] = index
+            self.image = images[index]
 
     def check_animation_time(self):
         self.animation_trigger = False
-        time_now = pg.time.get_ticks()
+        time_now = self.game.get_ticks()
         if time_now - self.animation_time_prev > self.animation_time:
             self.animation_time_prev = time_now
             self.animation_trigger = True
 
     def get_images(self, path):
-        images = deque()
-        for file_name in os.listdir(path):
-            if os.path.isfile(os.path.join(path, file_name)):
-                img = pg.image.load(path + '/' + file_name).convert_alpha()
-                images.append(img)
-        return images
\ No newline at end of file
+        return assets.get_animation(path, self.game.headless)
\ No newline at end of file
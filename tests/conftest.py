@@ -0,0 +1,19 @@
+import os
+import sys
+import pytest
+
+# the game loads resources by relative path and its modules import each other from the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+os.environ['SDL_VIDEODRIVER'] = 'dummy'
+os.environ['SDL_AUDIODRIVER'] = 'dummy'
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope='module')
+def game():
+    # a headless game on the built-in map, shared by the tests of one module; decoded from source, so
+    # the tests neither depend on nor write the asset pack
+    from bench import get_benchmark_game
+    from settings import BENCH_SEED
+    return get_benchmark_game(None, BENCH_SEED, asset_pack=False)
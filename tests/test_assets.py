@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip('pygame')
+
+from assets import assets, ImageStub
+from spatial_index import SpatialGrid
+
+
+def get_counters():
+    return assets.loads, assets.pack_reads, len(assets.images), len(assets.animations), len(assets.sounds)
+
+
+def test_restarts_reuse_loaded_assets(game):
+    counters = get_counters()
+    for restart in range(3):
+        game.new_game()
+        assert get_counters() == counters
+
+        # every npc gone: the win screen, then a new game
+        game.object_handler.npc_grid = SpatialGrid()
+        game.object_handler.npcs_left = 0
+        player = game.player
+        game.object_handler.check_win()
+        assert game.player is not player
+        assert get_counters() == counters
+
+        # out of health: the game over screen, then a new game
+        player = game.player
+        player.health = 0
+        player.check_game_over()
+        assert game.player is not player
+        assert get_counters() == counters
+
+
+def test_headless_games_leave_images_decoded(game):
+    from controls import InputReplay
+    from soak import SoakGame
+    headless = SoakGame(InputReplay.generate(10, 0), num_npcs=10, profile=False, seed=0)
+    assert all(not hasattr(npc.image, 'convert') for npc in headless.object_handler.npc_list)
+    assert not any(isinstance(image, ImageStub) for image in assets.images.values())
+    game.new_game()
+    assert all(hasattr(npc.image, 'convert') for npc in game.object_handler.npc_list)
+
+
+def test_later_games_decode_nothing_again(game, monkeypatch):
+    from bench import get_benchmark_game
+    from settings import BENCH_SEED
+    decoded = []
+    decode = assets.decode
+    monkeypatch.setattr(assets, 'decode', lambda path: decoded.append(path) or decode(path))
+    cached = {path for path, size in assets.images} | set(assets.sounds)
+    get_benchmark_game(None, BENCH_SEED, asset_pack=False)
+    # only files no game has asked for yet are decoded, the rest come from the registry
+    assert cached and not cached & set(decoded)
@@ -0,0 +1,85 @@
+import random
+from bench import get_benchmark_game, time_frames
+from controls import LiveInput, InputRecorder, InputReplay
+from settings import BENCH_SEED, SIM_DT
+
+
+def get_state(game):
+    player = game.player
+    return (player.x, player.y, player.angle, player.health,
+            [(npc.x, npc.y, npc.health, npc.alive) for npc in game.object_handler.npc_list])
+
+
+def run(controls, num_frames, update_cost=None):
+    game = get_benchmark_game(controls, BENCH_SEED, asset_pack=False)
+    game.camera.adaptive = False
+    if update_cost is not None:
+        # every npc update takes update_cost milliseconds, as if measured on a much slower machine
+        game.scheduler.update_cost = update_cost
+        game.scheduler.run = lambda npcs: [npc.step() for npc in npcs]
+    time_frames(game, num_frames)
+    return get_state(game)
+
+
+def test_benchmark_does_not_depend_on_machine_speed():
+    fast = run(InputReplay.generate(300, BENCH_SEED), 300)
+    slow = run(InputReplay.generate(300, BENCH_SEED), 300, update_cost=0.5)
+    assert fast == slow
+
+
+class ScriptedInput(LiveInput):
+    # live input driven by a generated script instead of a person, one entry per rendered frame
+    def __init__(self, frames):
+        self.script = InputReplay(frames)
+        self.rel = 0, 0
+
+    def next_frame(self):
+        self.script.next_frame()
+        self.rel = tuple(self.script.frame['rel'])
+
+    def get_events(self):
+        return self.script.get_events()
+
+    def get_pressed(self):
+        return self.script.get_pressed()
+
+    def get_pos(self):
+        return self.script.get_pos()
+
+    def set_pos(self, pos):
+        pass
+
+    def get_rel(self):
+        # like pygame, the motion since the last call: all of it on the frame's first tick
+        rel, self.rel = self.rel, (0, 0)
+        return rel
+
+
+class ScriptedRecorder(InputRecorder, ScriptedInput):
+    def __init__(self, frames):
+        InputRecorder.__init__(self, None)
+        ScriptedInput.__init__(self, frames)
+
+    def next_frame(self):
+        ScriptedInput.next_frame(self)
+
+
+def test_recording_replays_the_game_played(tmp_path):
+    # frames that run no tick, one tick or several, as when rendering is faster or slower than the simulation
+    rng = random.Random(BENCH_SEED)
+    frame_times = [rng.choice((0, SIM_DT / 2, SIM_DT, 3 * SIM_DT)) for frame in range(300)]
+    recorder = ScriptedRecorder(InputReplay.generate(len(frame_times), BENCH_SEED).frames)
+    game = get_benchmark_game(recorder, BENCH_SEED, asset_pack=False)
+    game.camera.adaptive = False
+    for frame_time in frame_times:
+        game.delta_time = frame_time
+        game.check_events()
+        game.update()
+        game.draw()
+    played = get_state(game)
+
+    recorder.path = tmp_path / 'recording.json'
+    recorder.close()
+    replay = InputReplay.load(recorder.path)
+    assert len(replay.frames) == round(game.sim_time / SIM_DT)
+    assert run(replay, len(replay.frames)) == played
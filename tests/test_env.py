@@ -0,0 +1,59 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+
+def get_actions(num_steps, num_envs, seed=0):
+    # always walking forward, so the player leaves the npc-free start area and fights
+    rng = np.random.default_rng(seed)
+    turns = np.repeat(rng.integers(-20, 21, (num_steps // 30 + 1, num_envs)), 30, axis=0)[:num_steps]
+    return np.stack([np.ones((num_steps, num_envs), int), rng.integers(-1, 2, (num_steps, num_envs)),
+                     turns, rng.random((num_steps, num_envs)) < 0.05], axis=2)
+
+
+def play(env, actions):
+    rewards = []
+    for action in actions:
+        observation, reward, done, info = env.step(action)
+        rewards.append(reward)
+    return {name: array.copy() for name, array in observation.items()}, rewards
+
+
+def test_env_replays_with_seed():
+    from env import DuumEnv
+    actions = get_actions(600, 3)[:, 1]
+    runs = []
+    for run in range(2):
+        env = DuumEnv()
+        env.reset(7)
+        runs.append(play(env, actions))
+    # an env that has already played starts the same episode over
+    play(env, get_actions(137, 3, seed=1)[:, 0])
+    env.reset(7)
+    runs.append(play(env, actions))
+    (first, rewards), *again = runs
+    assert any(rewards)
+    for second, rewards_again in again:
+        assert rewards == rewards_again
+        for name in first:
+            np.testing.assert_array_equal(first[name], second[name])
+
+
+def test_vector_env_independent_of_workers():
+    from env import VectorEnv
+    actions = get_actions(600, 3)
+    runs = []
+    for workers in (1, 3):
+        with VectorEnv(3, workers) as env:
+            env.reset(11)
+            runs.append(play(env, actions))
+            if workers > 1:
+                # workers that have already stepped start the same episodes over
+                env.reset(11)
+                runs.append(play(env, actions))
+    (first, rewards), *again = runs
+    assert np.any(rewards)
+    for second, rewards_again in again:
+        np.testing.assert_array_equal(rewards, rewards_again)
+        for name in first:
+            np.testing.assert_array_equal(first[name], second[name])
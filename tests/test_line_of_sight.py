@@ -0,0 +1,28 @@
+import random
+import pytest
+
+pytest.importorskip('numpy')
+
+
+def test_batched_matches_scalar(game):
+    player = game.player
+    npcs = game.object_handler.npc_list
+    line_of_sight = game.object_handler.line_of_sight
+    assert line_of_sight.backend == 'numpy'
+    rng = random.Random(0)
+    free = [(x, y) for y, row in enumerate(game.map.mini_map) for x, tile in enumerate(row) if not tile]
+    visible = 0
+    for trial in range(200):
+        x, y = rng.choice(free)
+        player.x, player.y = x + rng.random(), y + rng.random()
+        for npc in npcs:
+            x, y = rng.choice(free)
+            npc.x, npc.y = x + rng.random(), y + rng.random()
+            npc.find_player()
+        line_of_sight.update(npcs)
+        for npc in npcs:
+            expected = npc.ray_cast_player_npc()
+            assert line_of_sight.visible[npc] == expected, (player.pos, (npc.x, npc.y))
+            visible += expected
+    # the poses cover both outcomes
+    assert 0 < visible < 200 * len(npcs)
@@ -0,0 +1,19 @@
+import math
+import pytest
+
+pytest.importorskip('numpy')
+
+
+def test_floor_and_ceiling_behind_a_wall_filling_the_screen(game):
+    renderer = game.object_render
+    player = game.player
+    renderer.ceiling_pixels = renderer.get_floor_pixels('resources/textures/1.png')
+    try:
+        for x, y, angle in ((1.05, 5.0, math.pi), (3.5, 3.5, 0)):
+            # right up against a wall, then in the open
+            player.x, player.y, player.angle = x, y, angle
+            player.interpolate(1)
+            game.raycasting.update()
+            renderer.draw_background()
+    finally:
+        renderer.ceiling_pixels = None
@@ -0,0 +1,30 @@
+import math
+import random
+import pytest
+
+pytest.importorskip('numpy')
+
+
+def test_backends_match(game):
+    raycasting = game.raycasting
+    player = game.player
+    rng = random.Random(0)
+    free = [(x, y) for y, row in enumerate(game.map.mini_map) for x, tile in enumerate(row) if not tile]
+    for pose in range(200):
+        x, y = rng.choice(free)
+        player.x, player.y, player.angle = x + rng.random(), y + rng.random(), rng.random() * math.tau
+        player.save_state()
+        player.interpolate(1)
+
+        raycasting.ray_cast_python()
+        expected = raycasting.ray_casting_result
+        raycasting.ray_cast_numpy()
+        result = raycasting.ray_casting_result
+
+        assert len(result) == len(expected) == game.camera.num_rays
+        for (depth, proj_height, texture, offset), (depth_np, proj_height_np, texture_np, offset_np) in zip(
+                expected, result):
+            assert texture_np == texture
+            assert depth_np == pytest.approx(depth, rel=1e-6, abs=1e-9)
+            assert proj_height_np == pytest.approx(proj_height, rel=1e-6)
+            assert offset_np == pytest.approx(offset, abs=1e-6)